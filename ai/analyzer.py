@@ -1,95 +1,258 @@
 #!/usr/bin/env python3
 # ai/analyzer.py - AI analysis functionality for LeadFinder
 
+import asyncio
+import hashlib
 import re
 import time
-from typing import List, Dict, Any
-import openai
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
-from config import OPENAI_MODEL, OPENAI_API_KEY, AI_ENABLED, BATCH_SIZE, logger
+from config import (
+    OPENAI_MODEL, AI_ENABLED, BATCH_SIZE, OPENAI_CONCURRENCY, OPENAI_BATCH_POLL_INTERVAL,
+    OPENAI_RPM, OPENAI_TPM, AI_ANALYSIS_MAX_AGE_DAYS, logger
+)
 from database import Database
+from ai.client import get_client, get_async_client, run_sync
+from ai.rate_limiter import RateLimiter, estimate_tokens
 from utils.console import create_progress
+from utils.json_utils import json_loads, json_dumps
+
+# Batch API statuses after which a batch will make no further progress
+BATCH_FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+# System prompt for analyzing a single company
+ANALYSIS_SYSTEM_PROMPT = (
+    "You are an expert in energy efficiency and sustainable building solutions. "
+    "Analyze this potential lead to determine their energy efficiency needs and opportunities. "
+    "Focus on identifying their likely energy-related pain points and how LogicLamp Technologies "
+    "(a company specializing in energy efficiency solutions like LED lighting and smart building technologies) "
+    "could help them reduce costs and improve sustainability. "
+    "Provide a brief opportunity assessment and a lead quality score from 0-100 based on their potential "
+    "need for energy efficiency solutions. Higher scores mean better opportunities."
+)
+
+# System prompt for analyzing several numbered companies in one request
+GROUP_ANALYSIS_SYSTEM_PROMPT = ANALYSIS_SYSTEM_PROMPT + (
+    " Several numbered companies follow. Return ONLY a JSON array. For each numbered company, "
+    "output {\"id\": N, \"score\": int, \"analysis\": str}."
+)
+
+# (field, default) pairs each prompt's company description is built from
+ANALYSIS_CONTEXT_FIELDS = (
+    ('name', 'Unknown'), ('category', 'Unknown'), ('address', 'Unknown'), ('city', ''), ('state', ''),
+    ('building_size', 'Unknown'), ('year_built', 'Unknown'), ('description', 'Unknown'),
+    ('contact_person', ''), ('contact_title', ''), ('website', '')
+)
+OUTREACH_CONTEXT_FIELDS = (
+    ('name', 'Unknown'), ('category', 'Unknown'), ('contact_person', 'Building Owner/Manager'),
+    ('contact_title', ''), ('building_size', 'Unknown'), ('year_built', 'Unknown'),
+    ('city', ''), ('state', ''), ('lead_score', 50), ('ai_analysis', None)
+)
+
+# Flat JSON objects, for picking results out of a response that isn't valid JSON as a whole
+_JSON_OBJECT_RE = re.compile(r'\{[^{}]+\}')
+
+# System prompt for personalized outreach emails
+OUTREACH_SYSTEM_PROMPT = (
+    "You are a skilled sales development representative for LogicLamp Technologies, "
+    "a company specializing in energy efficiency and sustainability solutions including "
+    "LED lighting retrofits, smart building technologies, and energy management systems. "
+    "Write a personalized, compelling outreach email to this company. "
+    "Format your response with 'Subject: [Your subject line]' on the first line, "
+    "followed by the email body. "
+    "Focus on the specific benefits they would gain based on their profile. "
+    "Keep it concise (150-200 words), professional, and emphasize potential energy savings. "
+    "Do not use pushy sales language. Make it warm and conversational. "
+    "Include a clear call to action for a brief intro call."
+)
+
+def _prompt_hash(system_prompt: str, context: str) -> str:
+    """Identify a request by everything that determines its response"""
+    return hashlib.sha256(f"{OPENAI_MODEL}|{system_prompt}|{context}".encode('utf-8')).hexdigest()
+
+@lru_cache(maxsize=4096)
+def _format_context(outreach: bool, values: Tuple) -> str:
+    """Format a company description once; it's needed for cache keys as well as prompts"""
+    if outreach:
+        (name, category, contact_person, contact_title, building_size, year_built,
+         city, state, lead_score, ai_analysis) = values
+        company_context = (
+            f"Company: {name}\n"
+            f"Category/Industry: {category}\n"
+            f"Contact Person: {contact_person}, {contact_title}\n"
+            f"Building Size: {building_size}\n"
+            f"Year Built/Established: {year_built}\n"
+            f"City, State: {city}, {state}\n"
+            f"Lead Score: {lead_score}/100\n"
+        )
+        
+        # Add AI analysis if available
+        if ai_analysis:
+            company_context += f"\nAI Analysis: {ai_analysis}\n"
+        
+        return company_context
+    
+    (name, category, address, city, state, building_size, year_built, description,
+     contact_person, contact_title, website) = values
+    return (
+        f"Company: {name}\n"
+        f"Category/Industry: {category}\n"
+        f"Address: {address}, {city}, {state}\n"
+        f"Building Size: {building_size}\n"
+        f"Year Built/Established: {year_built}\n"
+        f"Description: {description}\n"
+        f"Contact: {contact_person}, {contact_title}\n"
+        f"Website: {website}\n"
+    )
+
+def _parse_group_analysis(text: str) -> Dict[int, Dict[str, Any]]:
+    """Map company numbers to their results in a grouped analysis response"""
+    try:
+        results = json_loads(text[text.index('['):text.rindex(']') + 1])
+    except ValueError:
+        # Salvage whichever objects are intact
+        results = []
+        for match in _JSON_OBJECT_RE.finditer(text):
+            try:
+                results.append(json_loads(match.group(0)))
+            except ValueError:
+                continue
+    
+    parsed = {}
+    for result in results:
+        try:
+            parsed[int(result['id'])] = result
+        except (KeyError, TypeError, ValueError):
+            continue
+    return parsed
 
 class AIAnalyzer:
     """Uses OpenAI to analyze and enhance lead data"""
     
+    # Lead score line in a single-company analysis
+    _SCORE_RE = re.compile(r'(?:score|rating):\s*(\d+)', re.IGNORECASE)
+    
     def __init__(self, db: Database):
         self.db = db
         self.enabled = AI_ENABLED
         
-        if self.enabled:
-            openai.api_key = OPENAI_API_KEY
+        self.client = get_async_client() if self.enabled else None
+        
+        # Cleared by --no-cache to ignore (and overwrite) cached responses
+        self.use_cache = True
+        
+        # Bounds how many OpenAI requests are in flight at once; created on the loop that uses it,
+        # since before Python 3.10 asyncio primitives bind to the loop current at construction
+        self._semaphore = None
+        self._semaphore_loop = None
+        
+        # Keeps requests within the account's per-minute limits
+        self.rate_limiter = RateLimiter(OPENAI_RPM, OPENAI_TPM)
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """The concurrency limit for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(OPENAI_CONCURRENCY)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _complete(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        """Send a chat completion request once concurrency and rate limits allow it"""
+        async with self.semaphore:
+            await self.rate_limiter.acquire(estimate_tokens(messages, max_tokens))
+            response = await self.client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        return response.choices[0].message.content
+    
+    def _analysis_cache_key(self, company: Dict[str, Any]) -> str:
+        """Cache key for a company's AI analysis"""
+        return _prompt_hash(ANALYSIS_SYSTEM_PROMPT, self._company_context(company))
+    
+    @staticmethod
+    def _company_context(company: Dict[str, Any], outreach: bool = False) -> str:
+        """Describe a company for the analysis prompts, or for the outreach prompt"""
+        fields = OUTREACH_CONTEXT_FIELDS if outreach else ANALYSIS_CONTEXT_FIELDS
+        return _format_context(outreach, tuple(company.get(field, default) for field, default in fields))
+    
+    def _apply_cached_analysis(self, company: Dict[str, Any]) -> bool:
+        """Fill in a company's analysis from the cache, returning whether it was there"""
+        if not self.use_cache:
+            return False
+        
+        cached_analysis = self.db.ai_cache_get(self._analysis_cache_key(company))
+        
+        if isinstance(cached_analysis, dict) and cached_analysis.get('ai_analysis'):
+            logger.info(f"Using cached AI analysis for {company.get('name')}")
+            self._apply_analysis(company, cached_analysis['ai_analysis'], cached_analysis.get('ai_score'))
+            return True
+        
+        return False
+    
+    def _apply_analysis(self, company: Dict[str, Any], ai_analysis: str, ai_lead_score: Optional[int]):
+        """Store an AI analysis on a company and blend in its score"""
+        if ai_lead_score is not None:
+            # Blend AI score with algorithm score
+            original_score = company.get('lead_score', 50)
+            company['lead_score'] = int((original_score + ai_lead_score) / 2)
+        
+        # Add AI analysis to company
+        company['ai_analysis'] = ai_analysis
+        company['ai_analyzed_at'] = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    
+    def _has_fresh_analysis(self, company: Dict[str, Any]) -> bool:
+        """Whether a company already carries an analysis recent enough to keep"""
+        if not self.use_cache or not company.get('ai_analysis') or not company.get('ai_analyzed_at'):
+            return False
+        
+        try:
+            analyzed_at = datetime.fromisoformat(str(company['ai_analyzed_at']))
+        except ValueError:
+            return False
+        
+        # Stored timestamps are UTC
+        if analyzed_at.tzinfo is None:
+            analyzed_at = analyzed_at.replace(tzinfo=timezone.utc)
+        return (datetime.now(timezone.utc) - analyzed_at).days < AI_ANALYSIS_MAX_AGE_DAYS
     
-    def analyze_company(self, company: Dict[str, Any]) -> Dict[str, Any]:
+    def _cache_analysis(self, company: Dict[str, Any], ai_analysis: str, ai_lead_score: Optional[int]):
+        """Cache the raw AI analysis of a company under its prompt hash"""
+        self.db.ai_cache_set(self._analysis_cache_key(company), {'ai_analysis': ai_analysis, 'ai_score': ai_lead_score})
+    
+    async def analyze_company(self, company: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze a company to identify energy efficiency opportunities"""
         if not self.enabled:
             return company
         
         try:
-            # Check cache first
-            cache_key = f"ai_analysis_{company.get('id', '')}_{company.get('name')}_{company.get('city')}"
-            cached_analysis = self.db.cache_get(cache_key)
-            
-            if cached_analysis:
-                logger.info(f"Using cached AI analysis for {company.get('name')}")
-                
-                # Update the company with cached analysis
-                if isinstance(cached_analysis, dict):
-                    # If cache contains the full updated company
-                    for key, value in cached_analysis.items():
-                        company[key] = value
-                    return company
-                elif isinstance(cached_analysis, str):
-                    # If cache contains just the analysis text
-                    company['ai_analysis'] = cached_analysis
-                    return company
-                
-            # Prepare company context
-            company_context = (
-                f"Company: {company.get('name', 'Unknown')}\n"
-                f"Category/Industry: {company.get('category', 'Unknown')}\n"
-                f"Address: {company.get('address', 'Unknown')}, {company.get('city', '')}, {company.get('state', '')}\n"
-                f"Building Size: {company.get('building_size', 'Unknown')}\n"
-                f"Year Built/Established: {company.get('year_built', 'Unknown')}\n"
-                f"Description: {company.get('description', 'Unknown')}\n"
-                f"Contact: {company.get('contact_person', '')}, {company.get('contact_title', '')}\n"
-                f"Website: {company.get('website', '')}\n"
-            )
+            # Keep a recent analysis, then check cache
+            if self._has_fresh_analysis(company) or self._apply_cached_analysis(company):
+                return company
             
             # Ask AI to analyze energy efficiency opportunities
-            response = openai.ChatCompletion.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": (
-                        "You are an expert in energy efficiency and sustainable building solutions. "
-                        "Analyze this potential lead to determine their energy efficiency needs and opportunities. "
-                        "Focus on identifying their likely energy-related pain points and how LogicLamp Technologies "
-                        "(a company specializing in energy efficiency solutions like LED lighting and smart building technologies) "
-                        "could help them reduce costs and improve sustainability. "
-                        "Provide a brief opportunity assessment and a lead quality score from 0-100 based on their potential "
-                        "need for energy efficiency solutions. Higher scores mean better opportunities."
-                    )},
-                    {"role": "user", "content": company_context}
+            ai_analysis = await self._complete(
+                [
+                    {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": self._company_context(company)}
                 ],
                 temperature=0.5,
                 max_tokens=500
             )
             
-            ai_analysis = response.choices[0].message['content']
-            
             # Extract lead score from analysis
-            score_match = re.search(r'(?:score|rating):\s*(\d+)', ai_analysis, re.IGNORECASE)
-            if score_match:
-                ai_lead_score = int(score_match.group(1))
-                # Blend AI score with algorithm score
-                original_score = company.get('lead_score', 50)
-                company['lead_score'] = int((original_score + ai_lead_score) / 2)
-            
-            # Add AI analysis to company
-            company['ai_analysis'] = ai_analysis
+            score_match = self._SCORE_RE.search(ai_analysis)
+            ai_lead_score = int(score_match.group(1)) if score_match else None
             
             # Cache the analysis
-            self.db.cache_set(cache_key, {'ai_analysis': ai_analysis, 'lead_score': company.get('lead_score')})
+            self._cache_analysis(company, ai_analysis, ai_lead_score)
+            self._apply_analysis(company, ai_analysis, ai_lead_score)
             
             return company
             
@@ -97,90 +260,100 @@ class AIAnalyzer:
             logger.error(f"Error in AI company analysis: {e}")
             return company
     
-    def analyze_companies_batch(self, companies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Analyze a batch of companies"""
+    async def _analyze_group(self, companies: List[Dict[str, Any]]):
+        """Analyze several companies with a single request"""
+        # Number the companies so results can be matched back to them
+        user_content = "".join(
+            f"### COMPANY {i}\n{self._company_context(company)}\n" for i, company in enumerate(companies, 1)
+        )
+        
+        results = {}
+        try:
+            response_text = await self._complete(
+                [
+                    {"role": "system", "content": GROUP_ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_content}
+                ],
+                temperature=0.5,
+                max_tokens=300 * len(companies)
+            )
+            
+            results = _parse_group_analysis(response_text)
+            
+        except Exception as e:
+            logger.error(f"Error in grouped AI company analysis: {e}")
+        
+        for i, company in enumerate(companies, 1):
+            result = results.get(i)
+            if result and result.get('analysis'):
+                try:
+                    ai_lead_score = int(result['score'])
+                except (KeyError, TypeError, ValueError):
+                    ai_lead_score = None
+                self._cache_analysis(company, str(result['analysis']), ai_lead_score)
+                self._apply_analysis(company, str(result['analysis']), ai_lead_score)
+            else:
+                # The model skipped this one, ask about it on its own
+                await self.analyze_company(company)
+    
+    async def analyze_companies_batch(self, companies: List[Dict[str, Any]], k: int = BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Analyze a batch of companies, k companies per request"""
         if not self.enabled or not companies:
             return companies
         
-        results = []
-        
         # Create progress display
         progress, task = create_progress(f"Analyzing companies with AI...", len(companies))
         
         with progress:
-            for i, company in enumerate(companies):
-                # Add a small delay between API calls to avoid rate limits
-                if i > 0:
-                    time.sleep(0.5)
-                
-                # Analyze company
-                analyzed_company = self.analyze_company(company)
-                results.append(analyzed_company)
-                
-                # Update progress
-                progress.update(task, advance=1)
-                
-                # Process in smaller batches to reduce memory usage
-                if i > 0 and i % BATCH_SIZE == 0:
-                    logger.info(f"Analyzed {i}/{len(companies)} companies")
+            # Recent and cached analyses need no request at all
+            pending = [
+                company for company in companies
+                if not self._has_fresh_analysis(company) and not self._apply_cached_analysis(company)
+            ]
+            progress.update(task, advance=len(companies) - len(pending))
+            
+            # Dispatch every group up front; the semaphore keeps concurrency in check
+            groups = [pending[i:i + k] for i in range(0, len(pending), k)]
+            futures = []
+            for group in groups:
+                future = asyncio.ensure_future(self._analyze_group(group))
+                future.add_done_callback(lambda _, size=len(group): progress.update(task, advance=size))
+                futures.append(future)
+            
+            await asyncio.gather(*futures)
         
-        return results
+        return companies
     
-    def generate_outreach_email(self, company: Dict[str, Any]) -> str:
+    def _outreach_cache_key(self, company: Dict[str, Any]) -> str:
+        """Cache key for a company's outreach email"""
+        return _prompt_hash(OUTREACH_SYSTEM_PROMPT, self._company_context(company, outreach=True))
+    
+    def _outreach_messages(self, company: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Build the chat messages asking for a company's outreach email"""
+        return [
+            {"role": "system", "content": OUTREACH_SYSTEM_PROMPT},
+            {"role": "user", "content": self._company_context(company, outreach=True)}
+        ]
+    
+    async def generate_outreach_email(self, company: Dict[str, Any]) -> str:
         """Generate personalized outreach email for a company"""
         if not self.enabled:
             return "AI features are disabled. Configure your OpenAI API key to use this feature."
         
         try:
             # Check cache first
-            cache_key = f"outreach_email_{company.get('id', '')}_{company.get('name')}_{company.get('city')}"
-            cached_email = self.db.cache_get(cache_key)
+            cache_key = self._outreach_cache_key(company)
+            cached_email = self.db.ai_cache_get(cache_key) if self.use_cache else None
             
             if cached_email:
                 logger.info(f"Using cached outreach email for {company.get('name')}")
                 return cached_email
             
-            # Prepare company context
-            company_context = (
-                f"Company: {company.get('name', 'Unknown')}\n"
-                f"Category/Industry: {company.get('category', 'Unknown')}\n"
-                f"Contact Person: {company.get('contact_person', 'Building Owner/Manager')}, {company.get('contact_title', '')}\n"
-                f"Building Size: {company.get('building_size', 'Unknown')}\n"
-                f"Year Built/Established: {company.get('year_built', 'Unknown')}\n"
-                f"City, State: {company.get('city', '')}, {company.get('state', '')}\n"
-                f"Lead Score: {company.get('lead_score', 50)}/100\n"
-            )
-            
-            # Add AI analysis if available
-            if company.get('ai_analysis'):
-                company_context += f"\nAI Analysis: {company.get('ai_analysis')}\n"
-            
             # Ask AI to generate personalized outreach
-            response = openai.ChatCompletion.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": (
-                        "You are a skilled sales development representative for LogicLamp Technologies, "
-                        "a company specializing in energy efficiency and sustainability solutions including "
-                        "LED lighting retrofits, smart building technologies, and energy management systems. "
-                        "Write a personalized, compelling outreach email to this company. "
-                        "Format your response with 'Subject: [Your subject line]' on the first line, "
-                        "followed by the email body. "
-                        "Focus on the specific benefits they would gain based on their profile. "
-                        "Keep it concise (150-200 words), professional, and emphasize potential energy savings. "
-                        "Do not use pushy sales language. Make it warm and conversational. "
-                        "Include a clear call to action for a brief intro call."
-                    )},
-                    {"role": "user", "content": company_context}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
-            
-            email = response.choices[0].message['content']
+            email = await self._complete(self._outreach_messages(company), temperature=0.7, max_tokens=500)
             
             # Cache the email
-            self.db.cache_set(cache_key, email)
+            self.db.ai_cache_set(cache_key, email)
             
             return email
             
@@ -188,27 +361,132 @@ class AIAnalyzer:
             logger.error(f"Error generating outreach email: {e}")
             return f"Error generating email: {str(e)}"
     
-    def generate_outreach_emails_batch(self, companies: List[Dict[str, Any]]) -> List[str]:
-        """Generate outreach emails for a batch of companies"""
+    async def generate_outreach_emails_batch(self, companies: List[Dict[str, Any]]) -> List[str]:
+        """Generate outreach emails for a batch of companies concurrently"""
         if not self.enabled or not companies:
             return ["AI features are disabled"] * len(companies)
         
-        emails = []
-        
         # Create progress display
         progress, task = create_progress(f"Generating outreach emails...", len(companies))
         
         with progress:
-            for i, company in enumerate(companies):
-                # Add a small delay between API calls to avoid rate limits
-                if i > 0:
-                    time.sleep(0.5)
+            # Dispatch every request up front; the semaphore keeps concurrency in check
+            futures = [asyncio.ensure_future(self.generate_outreach_email(company)) for company in companies]
+            for future in futures:
+                future.add_done_callback(lambda _: progress.update(task, advance=1))
+            
+            emails = await asyncio.gather(*futures)
+        
+        return list(emails)
+    
+    def generate_outreach_emails_offline(self, companies: List[Dict[str, Any]]) -> List[str]:
+        """Generate outreach emails through the OpenAI Batch API
+        
+        Batch jobs cost half as much and draw on a separate rate limit, but can take
+        a while to finish, so this is meant for exports rather than interactive use.
+        """
+        if not self.enabled or not companies:
+            return ["AI features are disabled"] * len(companies)
+        
+        emails = [None] * len(companies)
+        batch_emails = {}
+        
+        try:
+            client = get_client()
+        except Exception as e:
+            logger.error(f"Error running outreach batch: {e}")
+            client = None
+        
+        # Finish any batch an interrupted run left behind before paying for a new one
+        if client:
+            for batch_id in self.db.get_unfinished_batches(BATCH_FINAL_STATUSES):
+                try:
+                    logger.info(f"Resuming outreach batch {batch_id}")
+                    batch_emails.update(self._collect_batch(client, client.batches.retrieve(batch_id)))
+                except Exception as e:
+                    logger.error(f"Error resuming outreach batch {batch_id}: {e}")
+        
+        # Only companies without a cached email go into the batch, one request per distinct prompt
+        requests = []
+        pending = {}
+        for i, company in enumerate(companies):
+            cache_key = self._outreach_cache_key(company)
+            cached_email = batch_emails.get(cache_key) or (self.db.ai_cache_get(cache_key) if self.use_cache else None)
+            if cached_email:
+                emails[i] = cached_email
+                continue
+            
+            if cache_key not in pending:
+                pending[cache_key] = []
+                # Requests are identified by their prompt hash, so a resumed batch's results
+                # can be matched to companies in whatever run picks them up
+                requests.append({
+                    "custom_id": cache_key,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": OPENAI_MODEL,
+                        "messages": self._outreach_messages(company),
+                        "temperature": 0.7,
+                        "max_tokens": 500
+                    }
+                })
+            pending[cache_key].append(i)
+        
+        if requests and client:
+            try:
+                # Upload the requests as JSONL and start the batch
+                payload = "\n".join(json_dumps(request) for request in requests).encode('utf-8')
+                batch_file = client.files.create(file=("outreach_batch.jsonl", payload), purpose="batch")
+                batch = client.batches.create(
+                    input_file_id=batch_file.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h"
+                )
+                self.db.record_batch(batch.id, batch.status)
+                logger.info(f"Submitted outreach batch {batch.id} for {len(requests)} companies")
                 
-                # Generate email
-                email = self.generate_outreach_email(company)
-                emails.append(email)
+                # Map each result back to its companies
+                results = self._collect_batch(client, batch)
+                for cache_key, indices in pending.items():
+                    for i in indices:
+                        emails[i] = results.get(cache_key)
+                    
+            except Exception as e:
+                logger.error(f"Error running outreach batch: {e}")
+        
+        # Anything the batch couldn't produce goes through the regular API
+        missing = [i for i, email in enumerate(emails) if email is None]
+        if missing:
+            fallback = run_sync(self.generate_outreach_emails_batch([companies[i] for i in missing]))
+            for i, email in zip(missing, fallback):
+                emails[i] = email
+        
+        return emails
+    
+    def _collect_batch(self, client, batch) -> Dict[str, str]:
+        """Wait for an outreach batch to finish and return its emails by cache key, caching each one"""
+        while batch.status not in BATCH_FINAL_STATUSES:
+            self.db.record_batch(batch.id, batch.status)
+            time.sleep(OPENAI_BATCH_POLL_INTERVAL)
+            batch = client.batches.retrieve(batch.id)
+        
+        emails = {}
+        if batch.status == "completed" and batch.output_file_id:
+            output = client.files.content(batch.output_file_id).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                result = json_loads(line)
+                response = result.get('response') or {}
+                if response.get('status_code') != 200:
+                    continue
                 
-                # Update progress
-                progress.update(task, advance=1)
+                emails[result['custom_id']] = response['body']['choices'][0]['message']['content']
+                self.db.ai_cache_set(result['custom_id'], emails[result['custom_id']])
+        else:
+            logger.error(f"Outreach batch {batch.id} ended with status {batch.status}")
         
-        return emails
\ No newline at end of file
+        # Mark the batch finished only once its emails are saved, so an interrupted run resumes it
+        self.db.record_batch(batch.id, batch.status)
+        return emails
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# ai/client.py - Shared OpenAI client helpers for LeadFinder
+
+import asyncio
+import atexit
+import httpx
+import openai
+
+from config import OPENAI_API_KEY, OPENAI_TIMEOUT, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE
+
+# Pooled HTTP/2 connections shared by every OpenAI client in the process
+_HTTP_LIMITS = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+
+_client = None
+_async_client = None
+_loop = None
+
+def get_client() -> openai.OpenAI:
+    """Return the shared synchronous OpenAI client"""
+    global _client
+    if _client is None:
+        http_client = httpx.Client(http2=True, limits=_HTTP_LIMITS, timeout=OPENAI_TIMEOUT)
+        _client = openai.OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT, http_client=http_client)
+    return _client
+
+def get_async_client() -> openai.AsyncOpenAI:
+    """Return the shared asynchronous OpenAI client"""
+    global _async_client
+    if _async_client is None:
+        http_client = httpx.AsyncClient(http2=True, limits=_HTTP_LIMITS, timeout=OPENAI_TIMEOUT)
+        _async_client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT, http_client=http_client)
+    return _async_client
+
+def run_sync(coro):
+    """Run a coroutine to completion on the shared AI event loop"""
+    # A single long-lived loop keeps the async client's connections usable across calls
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+@atexit.register
+def close_clients():
+    """Close pooled connections held by the shared clients"""
+    global _client, _async_client, _loop
+    if _client is not None:
+        _client.close()
+        _client = None
+    if _async_client is not None:
+        if _loop is not None and not _loop.is_closed():
+            _loop.run_until_complete(_async_client.close())
+        _async_client = None
+    if _loop is not None and not _loop.is_closed():
+        _loop.close()
+    _loop = None
@@ -1,15 +1,184 @@
 #!/usr/bin/env python3
 # ai/lead_finder.py - AI lead generation for LeadFinder
 
+import asyncio
+import hashlib
+import itertools
 import json
 import re
+import sqlite3
 import time
-from typing import List, Dict, Any
-import openai
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
-from config import OPENAI_MODEL, OPENAI_API_KEY, AI_ENABLED, logger
+from config import OPENAI_MODEL, AI_ENABLED, logger
 from database import Database
+from ai.client import get_async_client
+from models.company import CURRENT_YEAR, AGE_POINTS, age_points, size_score
 from utils.console import create_progress
+from utils.json_utils import json_loads
+
+# Patterns used to pull lead details out of free-form AI responses
+_SECTION_SPLIT_RE = re.compile(r'\d+\.\s+|\n\n+')
+_NAME_RE = re.compile(r'^([^:\n]+)(?::|$)')
+
+# Labelled lead fields: single-line values first, then values that may continue onto
+# following colon-free lines (a line with a colon starts the next label)
+_FIELD_RE = re.compile(
+    r'(?:(?P<category>Type|Category|Industry)'
+    r'|(?P<building_size>Size|Building Size)'
+    r'|(?P<contact_title>Contact|Decision[- ]maker|Key Person)):\s*(?P<line>[^\n]+)'
+    r'|(?:(?P<ai_analysis>Reason|Why|Benefits|Opportunity)'
+    r'|(?P<notes>Approach|Strategy|How to contact)):\s*(?P<block>[^\n]+(?:\n[^\n:]+(?=\n|$))*)',
+    re.IGNORECASE
+)
+_FIELD_KEYS = ('category', 'building_size', 'contact_title', 'ai_analysis', 'notes')
+
+# (company field, AI response field) pairs for translating AI output into company records
+_AI_LEAD_FIELDS = (
+    ('name', 'name'), ('category', 'category'), ('building_size', 'size'),
+    ('contact_title', 'contact_title'), ('description', 'reason'),
+    ('notes', 'approach'), ('ai_analysis', 'reason')
+)
+_AI_RESEARCH_FIELDS = (
+    ('address', 'address'), ('category', 'category'), ('building_size', 'building_size'),
+    ('year_built', 'year_built'), ('description', 'description'),
+    ('contact_person', 'contact_person'), ('contact_title', 'contact_title'),
+    ('notes', 'approach'), ('ai_analysis', 'energy_needs')
+)
+
+def _cache_key(prefix: str, *parts: str) -> str:
+    """Build a cache key from a query's normalized inputs and the model that answers it"""
+    normalized = "|".join([OPENAI_MODEL] + [str(part).strip().lower() for part in parts])
+    return f"{prefix}_{hashlib.sha256(normalized.encode('utf-8')).hexdigest()}"
+
+def _find_json(text: str, opener: str = '{', closer: str = '}') -> Optional[str]:
+    """Return the first balanced JSON value delimited by opener/closer, or None"""
+    # Single linear scan; unlike a greedy DOTALL regex it stops at the matching
+    # closer, so trailing prose after the JSON is ignored
+    start = text.find(opener)
+    if start < 0:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = in_string
+        elif char == '"':
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif char == opener:
+            depth += 1
+        elif char == closer:
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+class _JsonArrayScanner:
+    """Incrementally pulls complete objects out of a JSON array as it streams in"""
+    
+    def __init__(self):
+        self.started = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.current = []
+    
+    def feed(self, text: str) -> List[str]:
+        """Consume the next piece of text and return any objects it completed"""
+        objects = []
+        for char in text:
+            if not self.started:
+                # Skip any prose before the array opens
+                if char == '[':
+                    self.started = True
+                    self.depth = 1
+                continue
+            if self.depth == 0:
+                break
+            if self.depth >= 2:
+                self.current.append(char)
+            if self.escaped:
+                self.escaped = False
+            elif char == '\\':
+                self.escaped = self.in_string
+            elif char == '"':
+                self.in_string = not self.in_string
+            elif self.in_string:
+                continue
+            elif char in '[{':
+                if self.depth == 1 and char == '{':
+                    self.current = [char]
+                self.depth += 1
+            elif char in ']}':
+                self.depth -= 1
+                # A closing brace back at array level ends one lead
+                if self.depth == 1 and char == '}':
+                    objects.append(''.join(self.current))
+                    self.current = []
+        return objects
+
+HIGH_ENERGY_SECTORS = ('manufacturing', 'industrial', 'factory', 'warehouse', 
+                       'hospital', 'healthcare', 'hotel', 'lodging', 'data center',
+                       'office building', 'school', 'university', 'retail')
+
+OPPORTUNITY_KEYWORDS = ('high energy', 'inefficient', 'outdated', 'saving', 'cost reduction',
+                        'upgrade', 'retrofit', 'improvement', 'consumption', 'bill', 'expense')
+DECISION_MAKER_ROLES = ('owner', 'ceo', 'president', 'director', 'manager', 'facility')
+
+# AI leads weigh large buildings more heavily than scraped ones
+LEAD_SIZE_POINTS = (('large', 20), ('medium', 10), ('small', 5))
+
+# Keyword scans for lead scoring, one case-insensitive pass each
+HIGH_ENERGY_RE = re.compile('|'.join(map(re.escape, HIGH_ENERGY_SECTORS)), re.IGNORECASE)
+OPPORTUNITY_RE = re.compile('|'.join(map(re.escape, OPPORTUNITY_KEYWORDS)), re.IGNORECASE)
+DECISION_MAKER_RE = re.compile('|'.join(map(re.escape, DECISION_MAKER_ROLES)), re.IGNORECASE)
+
+def _sql_contains_any(column: str, keywords: Tuple[str, ...]) -> str:
+    """SQL condition that's true when a column contains any of the keywords, ignoring case"""
+    return "(" + " OR ".join(f"instr(lower({column}), '{keyword}') > 0" for keyword in keywords) + ")"
+
+# year_built without the surrounding whitespace int() ignores
+_SQL_YEAR = "trim(year_built, ' ' || char(9, 10, 11, 12, 13))"
+
+# Size and age CASE expressions, built from the same tables the Python scorers use
+_SQL_SIZE_CASE = "CASE " + " ".join(
+    f"WHEN instr(lower(building_size), '{label}') > 0 THEN {points}" for label, points in LEAD_SIZE_POINTS
+) + " ELSE 0 END"
+_SQL_AGE_CASE = "CASE " + " ".join(
+    f"WHEN {CURRENT_YEAR} - CAST({_SQL_YEAR} AS INTEGER) > {min_age} THEN {points}" for min_age, points in AGE_POINTS
+) + " ELSE 0 END"
+
+# The same rules as AILeadFinder._calculate_lead_score, as one SQL expression over a companies row
+LEAD_SCORE_SQL = f"""
+MIN(100, 50
+    + {_SQL_SIZE_CASE}
+    + CASE WHEN year_built IS NULL OR {_SQL_YEAR} = '' THEN 0
+           WHEN {_SQL_YEAR} NOT GLOB '*[^0-9]*' THEN {_SQL_AGE_CASE}
+           WHEN {_sql_contains_any('year_built', ('old', 'aging'))} THEN 15 ELSE 0 END
+    + CASE WHEN {_sql_contains_any('category', HIGH_ENERGY_SECTORS)} THEN 15 ELSE 0 END
+    + MIN(15, 3 * COALESCE({' + '.join(f"(instr(lower(ai_analysis), '{keyword}') > 0)" for keyword in OPPORTUNITY_KEYWORDS)}, 0))
+    + CASE WHEN {_sql_contains_any('contact_title', DECISION_MAKER_ROLES)} THEN 10 ELSE 0 END
+)
+"""
+
+# Sample values per scored column; rescoring checks LEAD_SCORE_SQL against
+# _calculate_lead_score on every combination before touching the database
+LEAD_SCORE_SAMPLES = {
+    'building_size': (None, '', 'Large', 'medium office', 'SMALL', 'unknown'),
+    'year_built': (None, '', '  ', '1980', ' 1980', '1980\n', '2000', '2010', str(CURRENT_YEAR),
+                   'old', 'Aging', 'unknown', '19x0'),
+    'category': (None, '', 'Hospital', 'Data Center', 'bakery'),
+    'ai_analysis': (None, '', 'High energy bills and an outdated retrofit', 'saving saving', 'none'),
+    'contact_title': (None, '', 'CEO', 'Facility Manager', 'intern')
+}
 
 class AILeadFinder:
     """Uses OpenAI to proactively find and identify potential leads"""
@@ -18,10 +187,17 @@ class AILeadFinder:
         self.db = db
         self.enabled = AI_ENABLED
         
-        if self.enabled:
-            openai.api_key = OPENAI_API_KEY
+        self.client = get_async_client() if self.enabled else None
+    
+    async def analyze_city(self, city: str, state: str, industry: str = None) -> Tuple[List[Dict[str, Any]], str, str]:
+        """Run lead generation, lead source and market analysis for a city concurrently"""
+        return await asyncio.gather(
+            self.find_potential_leads(city, state, industry),
+            self.identify_lead_sources(city, state),
+            self.analyze_market_potential(city, state)
+        )
     
-    def find_potential_leads(self, city: str, state: str, industry: str = None) -> List[Dict[str, Any]]:
+    async def find_potential_leads(self, city: str, state: str, industry: str = None) -> List[Dict[str, Any]]:
         """Use AI to generate potential leads based on city, state, and optional industry"""
         if not self.enabled:
             logger.warning("AI features are disabled")
@@ -29,7 +205,7 @@ class AILeadFinder:
         
         try:
             # Check cache first
-            cache_key = f"ai_leads_{city}_{state}_{industry or 'all'}"
+            cache_key = _cache_key("ai_leads", city, state, industry or 'all')
             cached_leads = self.db.cache_get(cache_key)
             
             if cached_leads:
@@ -54,7 +230,7 @@ class AILeadFinder:
             # Ask AI to generate potential leads
             logger.info(f"Using AI to identify potential leads in {city}, {state}")
             
-            response = openai.ChatCompletion.create(
+            stream = await self.client.chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": (
@@ -74,78 +250,72 @@ class AILeadFinder:
                     {"role": "user", "content": context}
                 ],
                 temperature=0.7,
-                max_tokens=1000
+                max_tokens=1000,
+                stream=True
             )
             
-            # Parse AI response - looking for JSON format
-            response_text = response.choices[0].message['content']
-            
-            # Extract JSON array from response
-            try:
-                # Find JSON array in the response
-                import re
-                import json
-                
-                # Try to extract JSON using regex
-                json_match = re.search(r'\[\s*\{.*\}\s*\]', response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    ai_generated_leads = json.loads(json_str)
-                else:
-                    # Fall back to trying to parse the whole response
-                    ai_generated_leads = json.loads(response_text)
-                
-                # Convert AI generated leads to our lead format
-                leads = []
-                for lead in ai_generated_leads:
-                    company = {
-                        'name': lead.get('name', ''),
-                        'category': lead.get('category', ''),
-                        'building_size': lead.get('size', ''),
-                        'city': city,
-                        'state': state,
-                        'contact_title': lead.get('contact_title', ''),
-                        'description': lead.get('reason', ''),
-                        'notes': lead.get('approach', ''),
-                        'source': 'AI Generated',
-                        'ai_analysis': lead.get('reason', '')
-                    }
+            # Parse each lead as soon as its JSON object has fully arrived, so scoring
+            # overlaps with the rest of the response still streaming in
+            scanner = _JsonArrayScanner()
+            chunks = []
+            leads = []
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ''
+                chunks.append(delta)
+                for json_str in scanner.feed(delta):
+                    try:
+                        leads.append(self._lead_from_ai(json_loads(json_str), city, state))
+                    except (ValueError, AttributeError) as e:
+                        logger.warning(f"Skipping malformed lead in AI response: {e}")
+            
+            response_text = ''.join(chunks)
+            
+            # Extract JSON array from response if nothing was streamed out of it
+            if not leads:
+                try:
+                    # Try to extract the first balanced JSON array
+                    json_str = _find_json(response_text, '[', ']')
+                    if json_str:
+                        ai_generated_leads = json_loads(json_str)
+                    else:
+                        # Fall back to trying to parse the whole response
+                        ai_generated_leads = json_loads(response_text)
                     
-                    # Calculate a lead score
-                    company['lead_score'] = self._calculate_lead_score(company)
+                    # Convert AI generated leads to our lead format
+                    leads = [self._lead_from_ai(lead, city, state) for lead in ai_generated_leads]
                     
-                    # Add to results
-                    leads.append(company)
+                except json.JSONDecodeError as e:
+                    # If JSON parsing fails, try to extract structured information manually
+                    logger.warning(f"Could not parse JSON from AI response: {e}")
                     
-                    # Store in database
-                    self.db.insert_company(company)
-                
-                # Cache the results
-                self.db.cache_set(cache_key, leads)
-                
-                return leads
-                
-            except json.JSONDecodeError as e:
-                # If JSON parsing fails, try to extract structured information manually
-                logger.warning(f"Could not parse JSON from AI response: {e}")
-                
-                # Look for numbered list items or business names
-                leads = self._extract_leads_from_text(response_text, city, state)
-                
-                # Store in database
-                for company in leads:
-                    self.db.insert_company(company)
-                
-                # Cache the results
-                self.db.cache_set(cache_key, leads)
-                
-                return leads
+                    # Look for numbered list items or business names
+                    leads = self._extract_leads_from_text(response_text, city, state)
+            
+            # Store in database in a single transaction
+            self.db.insert_many(leads)
+            
+            # Cache the results
+            self.db.cache_set(cache_key, leads)
+            
+            return leads
                 
         except Exception as e:
             logger.error(f"Error using AI to find leads: {e}")
             return []
     
-    def research_company(self, company_name: str, city: str, state: str) -> Dict[str, Any]:
+    def _lead_from_ai(self, lead: Dict[str, Any], city: str, state: str) -> Dict[str, Any]:
+        """Convert one AI generated lead into our lead format"""
+        company = {dst: lead.get(src, '') for dst, src in _AI_LEAD_FIELDS}
+        company.update(city=city, state=state, source='AI Generated')
+        
+        # Calculate a lead score
+        company['lead_score'] = self._calculate_lead_score(company)
+        
+        return company
+    
+    async def research_company(self, company_name: str, city: str, state: str) -> Dict[str, Any]:
         """Use AI to research a specific company and generate lead information"""
         if not self.enabled:
             logger.warning("AI features are disabled")
@@ -153,7 +323,7 @@ class AILeadFinder:
         
         try:
             # Check cache first
-            cache_key = f"company_research_{company_name}_{city}_{state}"
+            cache_key = _cache_key("company_research", company_name, city, state)
             cached_research = self.db.cache_get(cache_key)
             
             if cached_research:
@@ -171,7 +341,7 @@ class AILeadFinder:
             # Ask AI to research the company
             logger.info(f"Using AI to research {company_name}")
             
-            response = openai.ChatCompletion.create(
+            response = await self.client.chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": (
@@ -193,43 +363,26 @@ class AILeadFinder:
                     )},
                     {"role": "user", "content": context}
                 ],
-                temperature=0.7,
+                temperature=0,  # Repeatable answers make cached research trustworthy
                 max_tokens=800
             )
             
             # Parse AI response
-            response_text = response.choices[0].message['content']
+            response_text = response.choices[0].message.content
             
             try:
-                # Extract JSON from response
-                import json
-                import re
-                
-                # Try to extract JSON object
-                json_match = re.search(r'\{\s*".*"\s*:.*\}', response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    company_data = json.loads(json_str)
+                # Try to extract the first balanced JSON object
+                json_str = _find_json(response_text, '{', '}')
+                if json_str:
+                    company_data = json_loads(json_str)
                 else:
                     # Fall back to trying to parse the whole response
-                    company_data = json.loads(response_text)
+                    company_data = json_loads(response_text)
                 
                 # Convert to our company format
-                company = {
-                    'name': company_data.get('name', company_name),
-                    'address': company_data.get('address', ''),
-                    'city': city,
-                    'state': state,
-                    'category': company_data.get('category', ''),
-                    'building_size': company_data.get('building_size', ''),
-                    'year_built': company_data.get('year_built', ''),
-                    'description': company_data.get('description', ''),
-                    'contact_person': company_data.get('contact_person', ''),
-                    'contact_title': company_data.get('contact_title', ''),
-                    'notes': company_data.get('approach', ''),
-                    'source': 'AI Researched',
-                    'ai_analysis': company_data.get('energy_needs', '')
-                }
+                company = {dst: company_data.get(src, '') for dst, src in _AI_RESEARCH_FIELDS}
+                company['name'] = company_data.get('name', company_name)
+                company.update(city=city, state=state, source='AI Researched')
                 
                 # Calculate lead score
                 company['lead_score'] = self._calculate_lead_score(company)
@@ -278,7 +431,7 @@ class AILeadFinder:
             logger.error(f"Error using AI to research company: {e}")
             return {'name': company_name, 'city': city, 'state': state, 'source': 'AI Research Failed'}
     
-    def identify_lead_sources(self, city: str, state: str) -> str:
+    async def identify_lead_sources(self, city: str, state: str) -> str:
         """Use AI to identify potential lead sources specific to a city"""
         if not self.enabled:
             logger.warning("AI features are disabled")
@@ -286,7 +439,7 @@ class AILeadFinder:
         
         try:
             # Check cache first
-            cache_key = f"lead_sources_{city}_{state}"
+            cache_key = _cache_key("lead_sources", city, state)
             cached_sources = self.db.cache_get(cache_key)
             
             if cached_sources:
@@ -304,7 +457,7 @@ class AILeadFinder:
             # Ask AI to identify lead sources
             logger.info(f"Using AI to identify lead sources in {city}, {state}")
             
-            response = openai.ChatCompletion.create(
+            response = await self.client.chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": (
@@ -326,7 +479,7 @@ class AILeadFinder:
                 max_tokens=600
             )
             
-            result = response.choices[0].message['content']
+            result = response.choices[0].message.content
             
             # Cache the result
             self.db.cache_set(cache_key, result)
@@ -337,7 +490,7 @@ class AILeadFinder:
             logger.error(f"Error identifying lead sources: {e}")
             return ""
     
-    def analyze_market_potential(self, city: str, state: str) -> str:
+    async def analyze_market_potential(self, city: str, state: str) -> str:
         """Use AI to analyze the market potential for energy efficiency solutions in a specific city"""
         if not self.enabled:
             logger.warning("AI features are disabled")
@@ -345,7 +498,7 @@ class AILeadFinder:
         
         try:
             # Check cache first
-            cache_key = f"market_analysis_{city}_{state}"
+            cache_key = _cache_key("market_analysis", city, state)
             cached_analysis = self.db.cache_get(cache_key)
             
             if cached_analysis:
@@ -362,7 +515,7 @@ class AILeadFinder:
             # Ask AI to analyze market potential
             logger.info(f"Using AI to analyze market potential in {city}, {state}")
             
-            response = openai.ChatCompletion.create(
+            response = await self.client.chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": (
@@ -384,7 +537,7 @@ class AILeadFinder:
                 max_tokens=1000
             )
             
-            result = response.choices[0].message['content']
+            result = response.choices[0].message.content
             
             # Cache the result
             self.db.cache_set(cache_key, result)
@@ -399,18 +552,15 @@ class AILeadFinder:
         """Extract lead information from non-JSON AI response text"""
         leads = []
         
-        # Look for numbered items or sections
-        import re
-        
         # Try to find business names with details
-        business_sections = re.split(r'\d+\.\s+|\n\n+', text)
+        business_sections = _SECTION_SPLIT_RE.split(text)
         
         for section in business_sections:
             if not section.strip():
                 continue
                 
             # Try to extract business name (usually at the beginning of a section)
-            name_match = re.search(r'^([^:\n]+)(?::|$)', section.strip())
+            name_match = _NAME_RE.search(section.strip())
             if name_match:
                 name = name_match.group(1).strip()
                 
@@ -426,30 +576,11 @@ class AILeadFinder:
                     'description': section.strip()
                 }
                 
-                # Try to extract category/industry
-                category_match = re.search(r'(?:Type|Category|Industry):\s*([^\n]+)', section, re.IGNORECASE)
-                if category_match:
-                    company['category'] = category_match.group(1).strip()
-                
-                # Try to extract size
-                size_match = re.search(r'(?:Size|Building Size):\s*([^\n]+)', section, re.IGNORECASE)
-                if size_match:
-                    company['building_size'] = size_match.group(1).strip()
-                
-                # Try to extract reason/benefits
-                reason_match = re.search(r'(?:Reason|Why|Benefits|Opportunity):\s*([^\n]+(?:\n[^\n:]+)*)', section, re.IGNORECASE)
-                if reason_match:
-                    company['ai_analysis'] = reason_match.group(1).strip()
-                
-                # Try to extract contact/decision-maker
-                contact_match = re.search(r'(?:Contact|Decision[- ]maker|Key Person):\s*([^\n]+)', section, re.IGNORECASE)
-                if contact_match:
-                    company['contact_title'] = contact_match.group(1).strip()
-                
-                # Try to extract approach
-                approach_match = re.search(r'(?:Approach|Strategy|How to contact):\s*([^\n]+(?:\n[^\n:]+)*)', section, re.IGNORECASE)
-                if approach_match:
-                    company['notes'] = approach_match.group(1).strip()
+                # Pick up labelled fields (category, size, reason, contact, approach) in one scan;
+                # the first occurrence of each field wins
+                for match in _FIELD_RE.finditer(section):
+                    field = next(key for key in _FIELD_KEYS if match.group(key))
+                    company.setdefault(field, (match.group('line') or match.group('block')).strip())
                 
                 # Calculate lead score
                 company['lead_score'] = self._calculate_lead_score(company)
@@ -458,34 +589,45 @@ class AILeadFinder:
         
         return leads
     
+    def rescore_leads(self) -> int:
+        """Recalculate the score of every AI-generated lead in the database"""
+        if not self._lead_score_sql_matches():
+            logger.error("LEAD_SCORE_SQL no longer matches _calculate_lead_score; not rescoring")
+            return 0
+        return self.db.rescore_all(LEAD_SCORE_SQL, source='AI Generated')
+    
+    def _lead_score_sql_matches(self) -> bool:
+        """Check that LEAD_SCORE_SQL and _calculate_lead_score agree on every sample lead"""
+        columns = list(LEAD_SCORE_SAMPLES)
+        conn = sqlite3.connect(':memory:')
+        try:
+            conn.execute(f"CREATE TABLE companies ({', '.join(columns)})")
+            conn.executemany(
+                f"INSERT INTO companies VALUES ({', '.join(['?' for _ in columns])})",
+                itertools.product(*LEAD_SCORE_SAMPLES.values())
+            )
+            
+            for row in conn.execute(f"SELECT {', '.join(columns)}, {LEAD_SCORE_SQL} FROM companies"):
+                company = dict(zip(columns, row))
+                if row[-1] != self._calculate_lead_score(company):
+                    logger.error(f"Lead score SQL disagrees for {company}")
+                    return False
+            return True
+        finally:
+            conn.close()
+    
     def _calculate_lead_score(self, company: Dict[str, Any]) -> int:
         """Calculate a lead score for AI-generated leads"""
         score = 50  # Base score
         
         # Size factor
         if company.get('building_size'):
-            size = str(company['building_size']).lower()
-            if 'large' in size:
-                score += 20
-            elif 'medium' in size:
-                score += 10
-            elif 'small' in size:
-                score += 5
+            score += size_score(str(company['building_size']), LEAD_SIZE_POINTS)
         
         # Year/age factor
         if company.get('year_built'):
             try:
-                year = int(company['year_built'])
-                from datetime import datetime
-                current_year = datetime.now().year
-                age = current_year - year
-                
-                if age > 30:
-                    score += 20
-                elif age > 20:
-                    score += 15
-                elif age > 10:
-                    score += 10
+                score += age_points(CURRENT_YEAR - int(company['year_built']))
             except (ValueError, TypeError):
                 # If not a valid year, check for age-related keywords
                 year_text = str(company['year_built']).lower()
@@ -494,35 +636,22 @@ class AILeadFinder:
         
         # Category/industry factor
         if company.get('category'):
-            category = str(company['category']).lower()
-            
-            high_energy_sectors = ['manufacturing', 'industrial', 'factory', 'warehouse', 
-                                  'hospital', 'healthcare', 'hotel', 'lodging', 'data center',
-                                  'office building', 'school', 'university', 'retail']
-            
-            for sector in high_energy_sectors:
-                if sector in category:
-                    score += 15
-                    break
+            score += _sector_score(str(company['category']))
         
         # AI analysis content
         if company.get('ai_analysis'):
-            analysis = str(company['ai_analysis']).lower()
-            
-            opportunity_keywords = ['high energy', 'inefficient', 'outdated', 'saving', 'cost reduction',
-                                   'upgrade', 'retrofit', 'improvement', 'consumption', 'bill', 'expense']
-            
-            keyword_count = sum(1 for keyword in opportunity_keywords if keyword in analysis)
+            # Count each distinct keyword once
+            keyword_count = len({keyword.lower() for keyword in OPPORTUNITY_RE.findall(str(company['ai_analysis']))})
             score += min(keyword_count * 3, 15)  # Up to 15 points for keywords
         
         # Contact information
-        if company.get('contact_title'):
-            decision_maker_roles = ['owner', 'ceo', 'president', 'director', 'manager', 'facility']
-            
-            for role in decision_maker_roles:
-                if role.lower() in str(company.get('contact_title', '')).lower():
-                    score += 10
-                    break
+        if company.get('contact_title') and DECISION_MAKER_RE.search(str(company['contact_title'])):
+            score += 10
         
         # Cap score at 100
-        return min(score, 100)
\ No newline at end of file
+        return min(score, 100)
+
+@lru_cache(maxsize=4096)
+def _sector_score(category: str) -> int:
+    """Score a category once; the same industries repeat across leads"""
+    return 15 if HIGH_ENERGY_RE.search(category) else 0
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# ai/rate_limiter.py - OpenAI request/token rate limiting for LeadFinder
+
+import asyncio
+import time
+from collections import deque
+from typing import List, Dict
+
+# Rolling window the limits apply to, in seconds
+WINDOW = 60.0
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """Rough token cost of a request: ~4 characters per prompt token plus the completion budget"""
+    return sum(len(message.get('content') or '') for message in messages) // 4 + max_tokens
+
+class RateLimiter:
+    """Keeps requests and tokens within per-minute limits, sleeping only when a limit is near"""
+    
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.request_times = deque()
+        self.token_usage = deque()  # (time, tokens) per request
+        self.tokens_used = 0
+        
+        # Created on the loop that uses it; before Python 3.10 asyncio primitives
+        # bind to the loop current at construction
+        self._lock = None
+        self._lock_loop = None
+    
+    @property
+    def lock(self) -> asyncio.Lock:
+        """The lock serializing acquire() on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+    
+    def _prune(self, now: float):
+        """Forget requests that have left the window"""
+        while self.request_times and now - self.request_times[0] >= WINDOW:
+            self.request_times.popleft()
+        while self.token_usage and now - self.token_usage[0][0] >= WINDOW:
+            self.tokens_used -= self.token_usage.popleft()[1]
+    
+    def _wait_time(self, now: float, tokens: int) -> float:
+        """Seconds until a request of this size fits within both limits"""
+        wait = 0.0
+        
+        # Requests per minute
+        if len(self.request_times) >= self.rpm:
+            wait = self.request_times[0] + WINDOW - now
+        
+        # Tokens per minute: wait for enough earlier usage to leave the window
+        if self.token_usage and self.tokens_used + tokens > self.tpm:
+            remaining = self.tokens_used
+            expires_at = self.token_usage[-1][0]
+            for used_at, used in self.token_usage:
+                remaining -= used
+                if remaining + tokens <= self.tpm:
+                    expires_at = used_at
+                    break
+            wait = max(wait, expires_at + WINDOW - now)
+        
+        return max(wait, 0.0)
+    
+    async def acquire(self, tokens: int):
+        """Wait until a request estimated at this many tokens may be sent, then record it"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            
+            self.request_times.append(now)
+            self.token_usage.append((now, tokens))
+            self.tokens_used += tokens
@@ -45,6 +45,29 @@ else:
 # OpenAI model to use for AI features
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
 
+# Seconds before an OpenAI request is abandoned
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+
+# Maximum number of OpenAI requests in flight at once
+OPENAI_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "10"))
+
+# AI analyses younger than this many days are reused rather than redone
+AI_ANALYSIS_MAX_AGE_DAYS = int(os.getenv("AI_ANALYSIS_MAX_AGE_DAYS", "30"))
+
+# Per-minute OpenAI request and token limits to stay under
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "90000"))
+
+# Outreach exports larger than this go through the cheaper OpenAI Batch API
+OPENAI_BATCH_THRESHOLD = int(os.getenv("OPENAI_BATCH_THRESHOLD", "50"))
+OPENAI_BATCH_POLL_INTERVAL = float(os.getenv("OPENAI_BATCH_POLL_INTERVAL", "30"))
+
+# Size of the shared keep-alive HTTP connection pool
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "40"))
+
+# Idle connections kept open for reuse between calls
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+
 # Selenium configuration
 SELENIUM_HEADLESS = os.getenv("SELENIUM_HEADLESS", "true").lower() == "true"
 SELENIUM_WINDOW_SIZE = os.getenv("SELENIUM_WINDOW_SIZE", "1920x1080")
@@ -52,18 +75,49 @@ SELENIUM_USER_AGENT = os.getenv(
     "SELENIUM_USER_AGENT", 
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
 )
+# Most idle browsers kept warm for reuse; extra ones are closed when returned
+SELENIUM_POOL_SIZE = int(os.getenv("SELENIUM_POOL_SIZE", "4"))
+
+# Skip images, fonts, media and trackers when loading pages in the browser
+SELENIUM_BLOCK_RESOURCES = os.getenv("SELENIUM_BLOCK_RESOURCES", "true").lower() == "true"
+
+# Keep browser profiles on disk so later runs start with a warm HTTP cache and HSTS list;
+# every concurrently open browser gets a numbered profile of its own under this directory
+SELENIUM_PERSIST_PROFILE = os.getenv("SELENIUM_PERSIST_PROFILE", "true").lower() == "true"
+SELENIUM_PROFILE_DIR = os.path.expanduser(os.getenv("SELENIUM_PROFILE_DIR", os.path.join(CONFIG_DIR, "chrome")))
+SELENIUM_DISK_CACHE_SIZE = int(os.getenv("SELENIUM_DISK_CACHE_SIZE", str(256 * 1024 * 1024)))
+
+# "eager" returns from navigation at DOMContentLoaded; scrapers wait explicitly for what they need
+SELENIUM_PAGE_LOAD_STRATEGY = os.getenv("SELENIUM_PAGE_LOAD_STRATEGY", "eager")
 
 # Rate limiting configuration
 SCRAPE_DELAY_MIN = float(os.getenv("SCRAPE_DELAY_MIN", "0.5"))
 SCRAPE_DELAY_MAX = float(os.getenv("SCRAPE_DELAY_MAX", "1.5"))
+SCRAPE_JITTER = os.getenv("SCRAPE_JITTER", "false").lower() == "true"
+
+# Range of the optional anti-bot jitter; explicit waits already cover page loads, so it stays short
+SCRAPE_JITTER_MIN = float(os.getenv("SCRAPE_JITTER_MIN", "0.2"))
+SCRAPE_JITTER_MAX = float(os.getenv("SCRAPE_JITTER_MAX", "0.5"))
+
+# Number of businesses whose details are fetched in parallel, each on its own browser
+DETAIL_WORKERS = int(os.getenv("DETAIL_WORKERS", "4"))
+
+# Most detail pages loaded from any one site at once, across all workers
+SOURCE_CONCURRENCY = int(os.getenv("SOURCE_CONCURRENCY", "2"))
 
 # Batch processing sizes
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "5"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
 
 # Cache settings
 CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
 CACHE_EXPIRY = int(os.getenv("CACHE_EXPIRY", "86400"))  # Default: 24 hours
 
+# Columns added to the companies table after its first release, for upgrading older databases
+COMPANY_COLUMN_MIGRATIONS = {
+    'ai_analyzed_at': 'TIMESTAMP'
+}
+
 # API endpoints
 YELLOWPAGES_BASE_URL = "https://www.yellowpages.com"
 GOOGLE_MAPS_BASE_URL = "https://www.google.com/maps/search/"
@@ -88,6 +142,7 @@ CREATE TABLE IF NOT EXISTS companies (
     source TEXT,
     lead_score INTEGER,
     ai_analysis TEXT,
+    ai_analyzed_at TIMESTAMP,
     contact_person TEXT,
     contact_title TEXT,
     contact_email TEXT,
@@ -114,6 +169,21 @@ CREATE TABLE IF NOT EXISTS search_history (
     searched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- OpenAI batch jobs
+CREATE TABLE IF NOT EXISTS ai_batches (
+    batch_id TEXT PRIMARY KEY,
+    status TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- AI responses keyed by a hash of the prompt that produced them
+CREATE TABLE IF NOT EXISTS ai_cache (
+    hash TEXT PRIMARY KEY,
+    response TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Cache table
 CREATE TABLE IF NOT EXISTS cache (
     key TEXT PRIMARY KEY,
@@ -5,12 +5,21 @@ import sqlite3
 import sys
 import json
 import time
-from typing import List, Dict, Any, Optional
-from rich.console import Console
+import threading
+from functools import wraps
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
-from config import DATABASE_PATH, DB_INIT_SQL, logger, CACHE_ENABLED, CACHE_EXPIRY
+from config import DATABASE_PATH, DB_INIT_SQL, COMPANY_COLUMN_MIGRATIONS, logger, CACHE_ENABLED, CACHE_EXPIRY
+from utils.console import console
+from utils.json_utils import json_loads, json_dumps
 
-console = Console()
+def _synchronized(method):
+    """Run a Database method while holding the connection lock"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class Database:
     """Database manager for LeadFinder"""
@@ -19,18 +28,31 @@ class Database:
         """Initialize database connection"""
         self.db_path = db_path
         self.conn = None
+        
+        # Scrapers for different sources share this connection from their own threads;
+        # one statement batch and its commit or rollback must not interleave with another's
+        self._lock = threading.RLock()
         self.init_db()
     
     def init_db(self):
         """Initialize the database if it doesn't exist"""
         try:
             # Connect to database (creates it if it doesn't exist)
-            self.conn = sqlite3.connect(self.db_path)
+            # Scrapers read and write the cache from worker threads, serialized by self._lock
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
             self.conn.row_factory = sqlite3.Row
             
             # Execute initialization SQL
             cursor = self.conn.cursor()
             cursor.executescript(DB_INIT_SQL)
+            
+            # Add columns that databases created by older versions lack
+            cursor.execute("PRAGMA table_info(companies)")
+            existing_columns = {row['name'] for row in cursor.fetchall()}
+            for column, column_type in COMPANY_COLUMN_MIGRATIONS.items():
+                if column not in existing_columns:
+                    cursor.execute(f"ALTER TABLE companies ADD COLUMN {column} {column_type}")
+            
             self.conn.commit()
             cursor.close()
             
@@ -40,6 +62,7 @@ class Database:
             console.print(f"[bold red]Error initializing database: {e}[/bold red]")
             sys.exit(1)
     
+    @_synchronized
     def close(self):
         """Close the database connection"""
         if self.conn:
@@ -51,6 +74,7 @@ class Database:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
     
+    @_synchronized
     def insert_company(self, company_data: Dict[str, Any]) -> int:
         """Insert a company record and return its ID"""
         try:
@@ -78,6 +102,52 @@ class Database:
             logger.error(f"Error inserting company: {e}")
             return None
     
+    @_synchronized
+    def insert_many(self, companies: List[Dict[str, Any]]) -> int:
+        """Insert several company records in one transaction and return how many were added"""
+        if not companies:
+            return 0
+        
+        try:
+            cursor = self.conn.cursor()
+            
+            # Find which of the batch's companies already exist, 500 names per query to
+            # stay well under SQLite's bound-parameter limit
+            names = list({company_data.get('name') for company_data in companies})
+            existing = set()
+            for start in range(0, len(names), 500):
+                batch = names[start:start + 500]
+                query = f"SELECT name, city FROM companies WHERE name IN ({', '.join('?' * len(batch))}) AND city IS NOT NULL"
+                cursor.execute(query, batch)
+                existing.update((row['name'], row['city']) for row in cursor.fetchall())
+            
+            # Skip companies that already exist or repeat within the batch
+            seen = set()
+            rows_by_columns = {}
+            for company_data in companies:
+                key = (company_data.get('name'), company_data.get('city'))
+                if key in seen or key in existing:
+                    continue
+                seen.add(key)
+                
+                # Records can carry different fields, so group them by column list
+                rows_by_columns.setdefault(tuple(company_data.keys()), []).append(tuple(company_data.values()))
+            
+            inserted = 0
+            for columns, rows in rows_by_columns.items():
+                placeholders = ', '.join(['?' for _ in columns])
+                query = f"INSERT INTO companies ({', '.join(columns)}) VALUES ({placeholders})"
+                cursor.executemany(query, rows)
+                inserted += len(rows)
+            
+            self.conn.commit()
+            return inserted
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.error(f"Error inserting companies: {e}")
+            return 0
+    
+    @_synchronized
     def update_company(self, company_id: int, update_data: Dict[str, Any]) -> bool:
         """Update a company record"""
         try:
@@ -97,41 +167,94 @@ class Database:
             logger.error(f"Error updating company: {e}")
             return False
     
-    def get_companies(self, limit: int = 100, offset: int = 0, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Get companies with optional filtering"""
+    @_synchronized
+    def update_many(self, companies: List[Dict[str, Any]], fields: List[str]) -> int:
+        """Update the given fields of several companies in one transaction, matched on name and city"""
+        if not companies or not fields:
+            return 0
+        
         try:
             cursor = self.conn.cursor()
             
-            query = "SELECT * FROM companies"
+            set_clause = ', '.join([f"{field} = ?" for field in fields])
+            rows = [
+                tuple(company.get(field) for field in fields) + (company.get('name'), company.get('city'))
+                for company in companies
+            ]
+            
+            query = f"UPDATE companies SET {set_clause} WHERE name = ? AND city = ?"
+            cursor.executemany(query, rows)
+            self.conn.commit()
+            
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.error(f"Error updating companies: {e}")
+            return 0
+    
+    def _companies_query(self, filters: Dict[str, Any] = None) -> Tuple[str, List[Any]]:
+        """Build the SELECT for companies matching the given filters"""
+        query = "SELECT * FROM companies"
+        params = []
+        
+        # Apply filters if provided
+        if filters:
+            where_clauses = []
+            for key, value in filters.items():
+                if key == 'id':
+                    where_clauses.append("id = ?")
+                    params.append(value)
+                elif key == 'city':
+                    where_clauses.append("city LIKE ?")
+                    params.append(f"%{value}%")
+                elif key == 'state':
+                    where_clauses.append("state = ?")
+                    params.append(value)
+                elif key == 'category':
+                    where_clauses.append("category LIKE ?")
+                    params.append(f"%{value}%")
+                elif key == 'min_lead_score':
+                    where_clauses.append("lead_score >= ?")
+                    params.append(value)
+                elif key == 'name':
+                    where_clauses.append("name LIKE ?")
+                    params.append(f"%{value}%")
+            
+            if where_clauses:
+                query += " WHERE " + " AND ".join(where_clauses)
+        
+        query += " ORDER BY lead_score DESC, scraped_at DESC"
+        return query, params
+    
+    @_synchronized
+    def rescore_all(self, score_sql: str, source: str = None) -> int:
+        """Recalculate lead scores with a single UPDATE, optionally only for one source"""
+        try:
+            cursor = self.conn.cursor()
+            
+            query = f"UPDATE companies SET lead_score = {score_sql}"
             params = []
+            if source:
+                query += " WHERE source = ?"
+                params.append(source)
             
-            # Apply filters if provided
-            if filters:
-                where_clauses = []
-                for key, value in filters.items():
-                    if key == 'id':
-                        where_clauses.append("id = ?")
-                        params.append(value)
-                    elif key == 'city':
-                        where_clauses.append("city LIKE ?")
-                        params.append(f"%{value}%")
-                    elif key == 'state':
-                        where_clauses.append("state = ?")
-                        params.append(value)
-                    elif key == 'category':
-                        where_clauses.append("category LIKE ?")
-                        params.append(f"%{value}%")
-                    elif key == 'min_lead_score':
-                        where_clauses.append("lead_score >= ?")
-                        params.append(value)
-                    elif key == 'name':
-                        where_clauses.append("name LIKE ?")
-                        params.append(f"%{value}%")
-                
-                if where_clauses:
-                    query += " WHERE " + " AND ".join(where_clauses)
+            cursor.execute(query, params)
+            self.conn.commit()
             
-            query += " ORDER BY lead_score DESC, scraped_at DESC LIMIT ? OFFSET ?"
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.error(f"Error rescoring companies: {e}")
+            return 0
+    
+    @_synchronized
+    def get_companies(self, limit: int = 100, offset: int = 0, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Get companies with optional filtering"""
+        try:
+            cursor = self.conn.cursor()
+            
+            query, params = self._companies_query(filters)
+            query += " LIMIT ? OFFSET ?"
             params.extend([limit, offset])
             
             cursor.execute(query, params)
@@ -140,6 +263,30 @@ class Database:
             logger.error(f"Error getting companies: {e}")
             return []
     
+    def iter_companies(self, limit: int = -1, filters: Dict[str, Any] = None, chunk: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield companies with optional filtering, fetching chunk rows at a time"""
+        try:
+            cursor = self.conn.cursor()
+            
+            # A negative limit means no limit
+            query, params = self._companies_query(filters)
+            query += " LIMIT ?"
+            params.append(limit)
+            
+            # Only hold the lock while reading, not while the caller works on a chunk
+            with self._lock:
+                cursor.execute(query, params)
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(chunk)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        except sqlite3.Error as e:
+            logger.error(f"Error iterating companies: {e}")
+    
+    @_synchronized
     def count_companies(self, filters: Dict[str, Any] = None) -> int:
         """Count companies with optional filtering"""
         try:
@@ -175,6 +322,7 @@ class Database:
             logger.error(f"Error counting companies: {e}")
             return 0
     
+    @_synchronized
     def record_export(self, export_type: str, file_path: str, record_count: int) -> int:
         """Record an export operation"""
         try:
@@ -188,6 +336,7 @@ class Database:
             logger.error(f"Error recording export: {e}")
             return None
     
+    @_synchronized
     def record_search(self, search_type: str, search_term: str, results_count: int) -> int:
         """Record a search operation"""
         try:
@@ -201,6 +350,39 @@ class Database:
             logger.error(f"Error recording search: {e}")
             return None
     
+    @_synchronized
+    def record_batch(self, batch_id: str, status: str) -> bool:
+        """Record an OpenAI batch job and its latest status"""
+        try:
+            cursor = self.conn.cursor()
+            
+            query = """
+            INSERT INTO ai_batches (batch_id, status) VALUES (?, ?)
+            ON CONFLICT(batch_id) DO UPDATE SET status = excluded.status, updated_at = CURRENT_TIMESTAMP
+            """
+            cursor.execute(query, (batch_id, status))
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.error(f"Error recording batch: {e}")
+            return False
+    
+    @_synchronized
+    def get_unfinished_batches(self, final_statuses: Tuple[str, ...]) -> List[str]:
+        """Get the ids of recorded batch jobs that haven't reached one of the final statuses, oldest first"""
+        try:
+            cursor = self.conn.cursor()
+            
+            placeholders = ', '.join(['?' for _ in final_statuses])
+            query = f"SELECT batch_id FROM ai_batches WHERE status NOT IN ({placeholders}) ORDER BY created_at"
+            cursor.execute(query, tuple(final_statuses))
+            return [row['batch_id'] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error getting unfinished batches: {e}")
+            return []
+    
+    @_synchronized
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
@@ -240,6 +422,7 @@ class Database:
             logger.error(f"Error getting stats: {e}")
             return {}
     
+    @_synchronized
     def cache_set(self, key: str, value: Any) -> bool:
         """Set a value in the cache"""
         if not CACHE_ENABLED:
@@ -250,7 +433,7 @@ class Database:
             
             # Convert value to JSON string if it's not a string
             if not isinstance(value, str):
-                value = json.dumps(value)
+                value = json_dumps(value)
                 
             # Insert or replace cache entry
             query = "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, datetime('now'))"
@@ -262,6 +445,7 @@ class Database:
             logger.error(f"Error setting cache: {e}")
             return False
     
+    @_synchronized
     def cache_get(self, key: str) -> Optional[Any]:
         """Get a value from the cache"""
         if not CACHE_ENABLED:
@@ -286,7 +470,7 @@ class Database:
             
             # Try to parse JSON
             try:
-                return json.loads(value)
+                return json_loads(value)
             except json.JSONDecodeError:
                 return value
                 
@@ -294,6 +478,60 @@ class Database:
             logger.error(f"Error getting from cache: {e}")
             return None
     
+    @_synchronized
+    def cache_get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get every unexpired cached value among the given keys in one pass"""
+        if not CACHE_ENABLED or not keys:
+            return {}
+            
+        try:
+            cursor = self.conn.cursor()
+            found = {}
+            
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                query = f"""
+                    SELECT key, value FROM cache 
+                    WHERE key IN ({', '.join('?' * len(batch))}) 
+                    AND datetime('now') < datetime(created_at, '+{CACHE_EXPIRY} seconds')
+                """
+                cursor.execute(query, batch)
+                
+                for row in cursor.fetchall():
+                    # Try to parse JSON
+                    try:
+                        found[row['key']] = json_loads(row['value'])
+                    except json.JSONDecodeError:
+                        found[row['key']] = row['value']
+            
+            return found
+        except sqlite3.Error as e:
+            logger.error(f"Error getting from cache: {e}")
+            return {}
+    
+    @_synchronized
+    def cache_set_many(self, values: Dict[str, Any]) -> bool:
+        """Set many cache values in a single transaction"""
+        if not CACHE_ENABLED or not values:
+            return False
+            
+        try:
+            cursor = self.conn.cursor()
+            
+            # Convert values to JSON strings where they're not strings
+            rows = [(key, value if isinstance(value, str) else json_dumps(value)) for key, value in values.items()]
+            
+            query = "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, datetime('now'))"
+            cursor.executemany(query, rows)
+            self.conn.commit()
+            
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error setting cache: {e}")
+            return False
+    
+    @_synchronized
     def cache_clear(self, key: str = None) -> bool:
         """Clear specific or all cache entries"""
         if not CACHE_ENABLED:
@@ -315,4 +553,54 @@ class Database:
             return True
         except sqlite3.Error as e:
             logger.error(f"Error clearing cache: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    @_synchronized
+    def ai_cache_set(self, prompt_hash: str, response: Any) -> bool:
+        """Store an AI response under the hash of its prompt"""
+        if not CACHE_ENABLED:
+            return False
+            
+        try:
+            cursor = self.conn.cursor()
+            
+            # Convert response to JSON string if it's not a string
+            if not isinstance(response, str):
+                response = json_dumps(response)
+            
+            query = "INSERT OR REPLACE INTO ai_cache (hash, response, created_at) VALUES (?, ?, datetime('now'))"
+            cursor.execute(query, (prompt_hash, response))
+            self.conn.commit()
+            
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error setting AI cache: {e}")
+            return False
+    
+    @_synchronized
+    def ai_cache_get(self, prompt_hash: str) -> Optional[Any]:
+        """Get the AI response cached for a prompt hash"""
+        if not CACHE_ENABLED:
+            return None
+            
+        try:
+            cursor = self.conn.cursor()
+            
+            # Identical prompts give equivalent answers, so entries don't expire
+            cursor.execute("SELECT response FROM ai_cache WHERE hash = ?", (prompt_hash,))
+            result = cursor.fetchone()
+            
+            if not result:
+                return None
+                
+            response = result['response']
+            
+            # Try to parse JSON
+            try:
+                return json_loads(response)
+            except json.JSONDecodeError:
+                return response
+                
+        except sqlite3.Error as e:
+            logger.error(f"Error getting from AI cache: {e}")
+            return None
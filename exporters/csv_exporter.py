@@ -2,11 +2,11 @@
 # exporters/csv_exporter.py - CSV export functionality for LeadFinder
 
 import os
-import csv
-import datetime
-from typing import List, Dict, Any
+import time
+from itertools import islice
+from typing import List, Dict, Any, Iterable
 
-from config import OUTPUT_DIR, logger
+from config import OUTPUT_DIR, EXPORT_CHUNK_SIZE, logger
 from database import Database
 
 class CSVExporter:
@@ -16,18 +16,28 @@ class CSVExporter:
         self.db = db
         self.output_dir = output_dir
         
+        # Number of companies written by the last export
+        self.record_count = 0
+        
         # Ensure output directory exists
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def export(self, companies: List[Dict[str, Any]], filename: str = None) -> str:
-        """Export companies to CSV file"""
-        if not companies:
+    def export(self, companies: Iterable[Dict[str, Any]], filename: str = None) -> str:
+        """Export companies to CSV file, streaming them EXPORT_CHUNK_SIZE rows at a time"""
+        rows = iter(companies)
+        chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+        self.record_count = 0
+        
+        if not chunk:
             logger.warning("No companies to export")
             return None
         
+        # pandas is slow to import, so only commands that export load it
+        import pandas as pd
+        
         # Generate filename if not provided
         if not filename:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = int(time.time())
             filename = f"leads_export_{timestamp}.csv"
         
         # Full path to output file
@@ -42,17 +52,19 @@ class CSVExporter:
         
         try:
             with open(output_path, 'w', newline='') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
-                writer.writeheader()
-                for company in companies:
-                    # Only write fields in our fieldnames list
-                    row = {field: company.get(field, '') for field in fieldnames}
-                    writer.writerow(row)
+                while chunk:
+                    # Project onto our fieldnames and write the chunk in one pass; object dtype
+                    # keeps integer columns with gaps from being written as floats
+                    df = pd.DataFrame(chunk, dtype=object).reindex(columns=fieldnames)
+                    df.to_csv(csvfile, index=False, header=self.record_count == 0, lineterminator='\r\n')
+                    
+                    self.record_count += len(chunk)
+                    chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
             
             # Record export in database
-            self.db.record_export("csv", output_path, len(companies))
+            self.db.record_export("csv", output_path, self.record_count)
             
-            logger.info(f"Exported {len(companies)} companies to CSV: {output_path}")
+            logger.info(f"Exported {self.record_count} companies to CSV: {output_path}")
             return output_path
         except Exception as e:
             logger.error(f"Error exporting to CSV: {e}")
@@ -66,19 +78,21 @@ class CSVExporter:
         
         # Generate filename if not provided
         if not filename:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = int(time.time())
             filename = f"outreach_emails_{timestamp}.txt"
         
         # Full path to output file
         output_path = os.path.join(self.output_dir, filename)
         
         try:
+            # Assemble the whole file first and write it in one call
+            separator = "=" * 70
+            parts = [
+                f"EMAIL #{i+1}: {company.get('name', 'Unknown Company')}\n{separator}\n\n{email}\n\n{separator}\n\n"
+                for i, (company, email) in enumerate(zip(companies, emails))
+            ]
             with open(output_path, 'w') as f:
-                for i, (company, email) in enumerate(zip(companies, emails)):
-                    f.write(f"EMAIL #{i+1}: {company.get('name', 'Unknown Company')}\n")
-                    f.write("=" * 70 + "\n\n")
-                    f.write(email + "\n\n")
-                    f.write("=" * 70 + "\n\n")
+                f.write("".join(parts))
             
             # Record export in database
             self.db.record_export("outreach_emails", output_path, len(companies))
@@ -2,13 +2,29 @@
 # exporters/hubspot_exporter.py - HubSpot export functionality for LeadFinder
 
 import os
-import csv
-import datetime
-from typing import List, Dict, Any
+import time
+from itertools import islice
+from typing import Dict, Any, Iterable
 
-from config import OUTPUT_DIR, logger
+from config import OUTPUT_DIR, EXPORT_CHUNK_SIZE, logger
 from database import Database
 
+# Company fields and the HubSpot columns they map to
+HUBSPOT_COLUMNS = {
+    'name': "Company",
+    'email': "Email",
+    'phone': "Phone",
+    'address': "Address",
+    'city': "City",
+    'state': "State/Region",
+    'zipcode': "Postal Code",
+    'website': "Website",
+    'category': "Industry",
+    'lead_score': "Lead Score",
+    'description': "Description",
+    'notes': "Notes"
+}
+
 class HubSpotExporter:
     """Handles exporting data to HubSpot-compatible format"""
     
@@ -16,18 +32,28 @@ class HubSpotExporter:
         self.db = db
         self.output_dir = output_dir
         
+        # Number of companies written by the last export
+        self.record_count = 0
+        
         # Ensure output directory exists
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def export(self, companies: List[Dict[str, Any]], filename: str = None) -> str:
-        """Export companies in HubSpot-compatible CSV format"""
-        if not companies:
+    def export(self, companies: Iterable[Dict[str, Any]], filename: str = None) -> str:
+        """Export companies in HubSpot-compatible CSV format, streaming them EXPORT_CHUNK_SIZE rows at a time"""
+        rows = iter(companies)
+        chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+        self.record_count = 0
+        
+        if not chunk:
             logger.warning("No companies to export")
             return None
         
+        # pandas is slow to import, so only commands that export load it
+        import pandas as pd
+        
         # Generate filename if not provided
         if not filename:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = int(time.time())
             filename = f"hubspot_export_{timestamp}.csv"
         
         # Full path to output file
@@ -42,42 +68,26 @@ class HubSpotExporter:
         
         try:
             with open(output_path, 'w', newline='') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=hubspot_fields)
-                writer.writeheader()
-                
-                for company in companies:
-                    # Parse contact name into first/last
-                    first_name = ""
-                    last_name = ""
-                    if company.get('contact_person'):
-                        name_parts = company['contact_person'].split(' ', 1)
-                        first_name = name_parts[0] if name_parts else ''
-                        last_name = name_parts[1] if len(name_parts) > 1 else ''
+                while chunk:
+                    df = pd.DataFrame(chunk, dtype=object)
+                    
+                    # Parse contact names into first/last for every row at once
+                    contacts = df['contact_person'] if 'contact_person' in df else pd.Series('', index=df.index)
+                    names = contacts.fillna('').astype(str).str.partition(' ')
+                    df['First Name'] = names[0]
+                    df['Last Name'] = names[2]
                     
-                    # Create HubSpot record
-                    hubspot_record = {
-                        "Company": company.get('name', ''),
-                        "First Name": first_name,
-                        "Last Name": last_name,
-                        "Email": company.get('email', ''),
-                        "Phone": company.get('phone', ''),
-                        "Address": company.get('address', ''),
-                        "City": company.get('city', ''),
-                        "State/Region": company.get('state', ''),
-                        "Postal Code": company.get('zipcode', ''),
-                        "Website": company.get('website', ''),
-                        "Industry": company.get('category', ''),
-                        "Lead Score": company.get('lead_score', ''),
-                        "Description": company.get('description', ''),
-                        "Notes": company.get('notes', '')
-                    }
+                    # Rename to HubSpot columns and write the chunk in one pass
+                    df = df.rename(columns=HUBSPOT_COLUMNS).reindex(columns=hubspot_fields)
+                    df.to_csv(csvfile, index=False, header=self.record_count == 0, lineterminator='\r\n')
                     
-                    writer.writerow(hubspot_record)
+                    self.record_count += len(chunk)
+                    chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
             
             # Record export in database
-            self.db.record_export("hubspot_csv", output_path, len(companies))
+            self.db.record_export("hubspot_csv", output_path, self.record_count)
             
-            logger.info(f"Exported {len(companies)} companies to HubSpot CSV: {output_path}")
+            logger.info(f"Exported {self.record_count} companies to HubSpot CSV: {output_path}")
             return output_path
         except Exception as e:
             logger.error(f"Error exporting to HubSpot CSV: {e}")
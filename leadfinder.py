@@ -3,26 +3,24 @@
 # Main entry point for the application
 
 import argparse
+import asyncio
+import itertools
 import sys
 import time
-from rich.console import Console
+from concurrent.futures import ThreadPoolExecutor
 from rich.panel import Panel
 
 # Import configuration
-from config import VERSION, AI_ENABLED
+from config import VERSION, AI_ENABLED, OPENAI_BATCH_THRESHOLD
 
 # Import modules
 from database import Database
 from ai.analyzer import AIAnalyzer
 from ai.lead_finder import AILeadFinder
-from scrapers.yellowpages_scraper import YellowPagesScraper
-from scrapers.googlemaps_scraper import GoogleMapsScraper
+from ai.client import run_sync
 from exporters.csv_exporter import CSVExporter
 from exporters.hubspot_exporter import HubSpotExporter
-from utils.console import display_table, display_welcome, display_dashboard
-
-# Initialize console
-console = Console()
+from utils.console import console, display_table, display_welcome, display_dashboard
 
 class LeadFinder:
     """Main application class"""
@@ -34,6 +32,60 @@ class LeadFinder:
         self.hubspot_exporter = HubSpotExporter(self.db)
         self.ai_analyzer = AIAnalyzer(self.db)
         self.ai_lead_finder = AILeadFinder(self.db)
+        
+        # Command name -> handler taking the parsed arguments
+        self._dispatch = {
+            "dashboard": lambda args: self.show_dashboard(),
+            "find": lambda args: self.find_leads(
+                city=args.city,
+                state=args.state,
+                category=args.category,
+                source=args.source,
+                count=args.count,
+                get_details=args.details
+            ),
+            "ai-find": lambda args: self.ai_find_leads(
+                city=args.city,
+                state=args.state,
+                industry=args.industry
+            ),
+            "research": lambda args: self.research_company(
+                name=args.name,
+                city=args.city,
+                state=args.state
+            ),
+            "sources": lambda args: self.identify_sources(
+                city=args.city,
+                state=args.state
+            ),
+            "market": lambda args: self.analyze_market(
+                city=args.city,
+                state=args.state
+            ),
+            "list": lambda args: self.list_companies(
+                limit=args.limit,
+                city=args.city,
+                state=args.state,
+                category=args.category,
+                min_score=args.min_score
+            ),
+            "export": lambda args: self.export_leads(
+                format_type=args.format,
+                city=args.city,
+                state=args.state,
+                min_score=args.min_score,
+                limit=args.limit
+            ),
+            "view": lambda args: self.view_company(args.id),
+            "outreach": lambda args: self.generate_outreach(
+                id=args.id,
+                count=args.count,
+                min_score=args.min_score,
+                export=args.export
+            ),
+            "rescore": lambda args: self.rescore_leads(),
+            "help": lambda args: self.show_help()
+        }
     
     def show_welcome(self):
         """Show welcome message"""
@@ -48,50 +100,71 @@ class LeadFinder:
         """Find leads in a specific city with optional filters"""
         console.print(f"[bold]Finding leads in {city}, {state}...[/bold]")
         
-        all_companies = []
+        # Scrapers pull in Selenium, so only load them for commands that scrape
+        from scrapers.yellowpages_scraper import YellowPagesScraper
+        from scrapers.googlemaps_scraper import GoogleMapsScraper
         
-        # YellowPages scraping
-        if source.lower() in ["all", "yellowpages"]:
+        def search_yellowpages():
             with YellowPagesScraper(self.db) as scraper:
-                console.print(f"[yellow]Searching YellowPages for businesses in {city}, {state}...[/yellow]")
                 companies = scraper.search_businesses(city, state, category, count)
                 
                 if get_details and companies:
                     console.print(f"[yellow]Getting detailed information for {len(companies)} businesses...[/yellow]")
                     companies = scraper.get_business_details_batch(companies)
                 
-                # Store companies in database
-                for company in companies:
-                    self.db.insert_company(company)
-                
-                console.print(f"[green]✓[/green] Found {len(companies)} businesses on YellowPages")
-                all_companies.extend(companies)
+                return companies
         
-        # Google Maps scraping
-        if source.lower() in ["all", "googlemaps"]:
+        def search_googlemaps():
             with GoogleMapsScraper(self.db) as scraper:
-                console.print(f"[yellow]Searching Google Maps for businesses in {city}, {state}...[/yellow]")
-                companies = scraper.search_businesses(city, state, category, count)
+                return scraper.search_businesses(city, state, category, count, get_details=get_details)
+        
+        searches = []
+        if source.lower() in ["all", "yellowpages"]:
+            searches.append(("YellowPages", search_yellowpages))
+        if source.lower() in ["all", "googlemaps"]:
+            searches.append(("Google Maps", search_googlemaps))
+        
+        all_companies = []
+        
+        # Sources are independent and mostly waiting on the network, so each searches
+        # on its own thread and pooled browser at the same time
+        with ThreadPoolExecutor(max_workers=max(len(searches), 1)) as executor:
+            futures = []
+            for source_name, search in searches:
+                console.print(f"[yellow]Searching {source_name} for businesses in {city}, {state}...[/yellow]")
+                futures.append((source_name, executor.submit(search)))
+            
+            # Collect in source order, so YellowPages listings still come first when deduplicating
+            for source_name, future in futures:
+                companies = future.result()
                 
-                # Store companies in database
-                for company in companies:
-                    self.db.insert_company(company)
+                # Store companies in database in a single transaction
+                self.db.insert_many(companies)
                 
-                console.print(f"[green]✓[/green] Found {len(companies)} businesses on Google Maps")
+                console.print(f"[green]✓[/green] Found {len(companies)} businesses on {source_name}")
                 all_companies.extend(companies)
         
+        # Both sources often list the same business; fold later listings into the first,
+        # filling in only the fields it's missing
+        seen = {}
+        unique_companies = []
+        for company in all_companies:
+            key = ((company.get('name') or '').lower(), (company.get('address') or '').lower())
+            if key in seen:
+                existing = unique_companies[seen[key]]
+                existing.update({k: v for k, v in company.items() if v and not existing.get(k)})
+            else:
+                seen[key] = len(unique_companies)
+                unique_companies.append(company)
+        all_companies = unique_companies
+        
         # AI Analysis if enabled and requested
         if AI_ENABLED and get_details:
             console.print(f"[yellow]Analyzing {len(all_companies)} companies with AI...[/yellow]")
-            all_companies = self.ai_analyzer.analyze_companies_batch(all_companies)
+            all_companies = run_sync(self.ai_analyzer.analyze_companies_batch(all_companies))
             
-            # Update in database
-            for company in all_companies:
-                if company.get('id'):
-                    self.db.update_company(company['id'], {
-                        'ai_analysis': company.get('ai_analysis'),
-                        'lead_score': company.get('lead_score')
-                    })
+            # Update in database in a single transaction
+            self.db.update_many(all_companies, ['ai_analysis', 'ai_analyzed_at', 'lead_score'])
         
         # Sort by lead score
         all_companies.sort(key=lambda x: x.get('lead_score', 0), reverse=True)
@@ -118,7 +191,7 @@ class LeadFinder:
         console.print(f"[bold]Using AI to find leads in {city}, {state}...[/bold]")
         
         # Find potential leads using AI
-        leads = self.ai_lead_finder.find_potential_leads(city, state, industry)
+        leads = run_sync(self.ai_lead_finder.find_potential_leads(city, state, industry))
         
         if not leads:
             console.print("[yellow]No leads were generated by AI. Try a different location or industry.[/yellow]")
@@ -148,7 +221,7 @@ class LeadFinder:
         console.print(f"[bold]Researching {name} in {city}, {state}...[/bold]")
         
         # Research the company
-        company = self.ai_lead_finder.research_company(name, city, state)
+        company = run_sync(self.ai_lead_finder.research_company(name, city, state))
         
         if not company:
             console.print(f"[yellow]Could not research company: {name}[/yellow]")
@@ -172,7 +245,7 @@ class LeadFinder:
         console.print(f"[bold]Identifying lead sources for {city}, {state}...[/bold]")
         
         # Get lead sources
-        sources = self.ai_lead_finder.identify_lead_sources(city, state)
+        sources = run_sync(self.ai_lead_finder.identify_lead_sources(city, state))
         
         # Display sources
         console.print(Panel.fit(
@@ -190,7 +263,7 @@ class LeadFinder:
         console.print(f"[bold]Analyzing market potential in {city}, {state}...[/bold]")
         
         # Get market analysis
-        analysis = self.ai_lead_finder.analyze_market_potential(city, state)
+        analysis = run_sync(self.ai_lead_finder.analyze_market_potential(city, state))
         
         # Display analysis
         console.print(Panel.fit(
@@ -244,24 +317,29 @@ class LeadFinder:
         if min_score:
             filters['min_lead_score'] = min_score
         
-        # Get companies
-        companies = self.db.get_companies(limit=limit, filters=filters)
+        # Stream companies straight from the database into the export
+        companies = self.db.iter_companies(limit=limit, filters=filters)
+        first_company = next(companies, None)
         
-        if not companies:
+        if first_company is None:
             console.print("[yellow]No companies found matching criteria.[/yellow]")
             return
         
+        companies = itertools.chain([first_company], companies)
+        
         if format_type.lower() == "hubspot":
             # Export to HubSpot format
-            output_path = self.hubspot_exporter.export(companies)
+            exporter = self.hubspot_exporter
             export_type = "HubSpot"
         else:
             # Export to standard CSV
-            output_path = self.csv_exporter.export(companies)
+            exporter = self.csv_exporter
             export_type = "standard"
         
+        output_path = exporter.export(companies)
+        
         if output_path:
-            console.print(f"[green]✓[/green] Exported {len(companies)} companies to {export_type} CSV: [cyan]{output_path}[/cyan]")
+            console.print(f"[green]✓[/green] Exported {exporter.record_count} companies to {export_type} CSV: [cyan]{output_path}[/cyan]")
         else:
             console.print(f"[red]✗[/red] Failed to export companies")
     
@@ -286,8 +364,12 @@ class LeadFinder:
         
         console.print(f"[bold]Generating outreach emails for {len(companies)} companies...[/bold]")
         
-        # Generate emails
-        emails = self.ai_analyzer.generate_outreach_emails_batch(companies)
+        # Generate emails; large exports don't need answers right away, so use the Batch API
+        if export and len(companies) > OPENAI_BATCH_THRESHOLD:
+            console.print(f"[yellow]Submitting {len(companies)} companies as an OpenAI batch job...[/yellow]")
+            emails = self.ai_analyzer.generate_outreach_emails_offline(companies)
+        else:
+            emails = run_sync(self.ai_analyzer.generate_outreach_emails_batch(companies))
         
         # Display or export emails
         if export:
@@ -308,6 +390,11 @@ class LeadFinder:
                 if i < len(emails) - 1:
                     console.print("\n")
     
+    def rescore_leads(self):
+        """Recalculate scores of AI-generated leads in the database"""
+        count = self.ai_lead_finder.rescore_leads()
+        console.print(f"[green]✓[/green] Rescored {count} AI-generated leads")
+    
     def view_company(self, company_id):
         """View detailed information about a company"""
         # Get company
@@ -319,27 +406,35 @@ class LeadFinder:
         
         company = companies[0]
         
-        # Get AI analysis panel if available
-        ai_panel = ""
+        # Build the detail lines, reading each field once
+        contact_title = company.get('contact_title')
+        lines = [
+            f"[bold]{company.get('name', 'Unknown')}[/bold]",
+            "",
+            f"[bold]Address:[/bold] {company.get('address', 'Unknown')}, {company.get('city', '')}, {company.get('state', '')} {company.get('zipcode', '')}",
+            f"[bold]Contact:[/bold] {company.get('contact_person', 'Unknown')}{', ' + contact_title if contact_title else ''}",
+            f"[bold]Phone:[/bold] {company.get('phone', 'Unknown')}",
+            f"[bold]Email:[/bold] {company.get('email', 'Unknown')}",
+            f"[bold]Website:[/bold] {company.get('website', 'Unknown')}",
+            "",
+            f"[bold]Category:[/bold] {company.get('category', 'Unknown')}",
+            f"[bold]Building Size:[/bold] {company.get('building_size', 'Unknown')}",
+            f"[bold]Year Built/Established:[/bold] {company.get('year_built', 'Unknown')}",
+            "",
+            f"[bold]Description:[/bold] {company.get('description', 'No description available.')}",
+            "",
+            f"[bold]Lead Score:[/bold] [cyan]{company.get('lead_score', 0)}/100[/cyan]",
+            f"[bold]Source:[/bold] {company.get('source', 'Unknown')}",
+            f"[bold]Scraped At:[/bold] {company.get('scraped_at', 'Unknown')}"
+        ]
+        
+        # Add AI analysis if available
         if company.get('ai_analysis'):
-            ai_panel = f"\n\n[bold]AI Analysis:[/bold]\n{company['ai_analysis']}"
+            lines.extend(["", "[bold]AI Analysis:[/bold]", company['ai_analysis']])
         
         # Display company details
         console.print(Panel.fit(
-            f"[bold]{company.get('name', 'Unknown')}[/bold]\n\n"
-            f"[bold]Address:[/bold] {company.get('address', 'Unknown')}, {company.get('city', '')}, {company.get('state', '')} {company.get('zipcode', '')}\n"
-            f"[bold]Contact:[/bold] {company.get('contact_person', 'Unknown')}{', ' + company.get('contact_title', '') if company.get('contact_title') else ''}\n"
-            f"[bold]Phone:[/bold] {company.get('phone', 'Unknown')}\n"
-            f"[bold]Email:[/bold] {company.get('email', 'Unknown')}\n"
-            f"[bold]Website:[/bold] {company.get('website', 'Unknown')}\n\n"
-            f"[bold]Category:[/bold] {company.get('category', 'Unknown')}\n"
-            f"[bold]Building Size:[/bold] {company.get('building_size', 'Unknown')}\n"
-            f"[bold]Year Built/Established:[/bold] {company.get('year_built', 'Unknown')}\n\n"
-            f"[bold]Description:[/bold] {company.get('description', 'No description available.')}\n\n"
-            f"[bold]Lead Score:[/bold] [cyan]{company.get('lead_score', 0)}/100[/cyan]\n"
-            f"[bold]Source:[/bold] {company.get('source', 'Unknown')}\n"
-            f"[bold]Scraped At:[/bold] {company.get('scraped_at', 'Unknown')}"
-            f"{ai_panel}",
+            "\n".join(lines),
             title=f"Company #{company_id}",
             border_style="green"
         ))
@@ -354,81 +449,16 @@ class LeadFinder:
             self.show_welcome()
             return
         
-        command = args.command
-        
-        if command == "dashboard":
-            self.show_dashboard()
-        
-        elif command == "find":
-            self.find_leads(
-                city=args.city,
-                state=args.state,
-                category=args.category,
-                source=args.source,
-                count=args.count,
-                get_details=args.details
-            )
-        
-        elif command == "ai-find":
-            self.ai_find_leads(
-                city=args.city,
-                state=args.state,
-                industry=args.industry
-            )
-        
-        elif command == "research":
-            self.research_company(
-                name=args.name,
-                city=args.city,
-                state=args.state
-            )
-        
-        elif command == "sources":
-            self.identify_sources(
-                city=args.city,
-                state=args.state
-            )
-        
-        elif command == "market":
-            self.analyze_market(
-                city=args.city,
-                state=args.state
-            )
-        
-        elif command == "list":
-            self.list_companies(
-                limit=args.limit,
-                city=args.city,
-                state=args.state,
-                category=args.category,
-                min_score=args.min_score
-            )
-        
-        elif command == "export":
-            self.export_leads(
-                format_type=args.format,
-                city=args.city,
-                state=args.state,
-                min_score=args.min_score,
-                limit=args.limit
-            )
-        
-        elif command == "view":
-            self.view_company(args.id)
-        
-        elif command == "outreach":
-            self.generate_outreach(
-                id=args.id,
-                count=args.count,
-                min_score=args.min_score,
-                export=args.export
-            )
-        
-        elif command == "help":
-            self.show_help()
+        # Ignore cached AI responses if requested
+        if getattr(args, 'no_cache', False):
+            self.ai_analyzer.use_cache = False
         
+        # Look up and run the command's handler
+        handler = self._dispatch.get(args.command)
+        if handler:
+            handler(args)
         else:
-            console.print(f"[red]Unknown command: {command}[/red]")
+            console.print(f"[red]Unknown command: {args.command}[/red]")
     
     def show_help(self):
         """Show help information"""
@@ -438,6 +468,7 @@ class LeadFinder:
             "  dashboard              - Show dashboard with statistics\n"
             "  list                   - List companies in the database\n"
             "  view ID                - View detailed information about a company\n"
+            "  rescore                - Recalculate scores of AI-generated leads\n"
             "  help                   - Show this help message\n\n"
             
             "[bold]Lead Finding:[/bold]\n"
@@ -478,6 +509,7 @@ class LeadFinder:
 def parse_args():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='LeadFinder - Real Lead Generation Tool')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore cached AI responses and request fresh ones')
     subparsers = parser.add_subparsers(dest='command', help='Command to run')
     
     # Dashboard command
@@ -541,6 +573,9 @@ def parse_args():
     outreach_parser.add_argument('--min-score', type=int, default=70, help='Minimum lead score')
     outreach_parser.add_argument('--export', action='store_true', help='Export emails to file')
     
+    # Rescore leads command
+    rescore_parser = subparsers.add_parser('rescore', help='Recalculate scores of AI-generated leads')
+    
     # Add help command
     help_parser = subparsers.add_parser('help', help='Show available commands')
     
@@ -548,6 +583,13 @@ def parse_args():
 
 def main():
     """Main entry point"""
+    # uvloop runs the AI and page-fetching event loops faster when it's installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     try:
         args = parse_args()
         app = LeadFinder()
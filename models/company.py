@@ -1,11 +1,36 @@
 #!/usr/bin/env python3
 # models/company.py - Company data model for LeadFinder
 
+import re
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
-@dataclass
+# Scoring rules shared by every lead scorer (the scrapers', the AI lead finder's and its SQL)
+
+# Categories that suggest a good fit for energy efficiency solutions
+ENERGY_KEYWORDS = ('energy', 'utilities', 'building', 'property', 'office', 'commercial', 
+                   'industrial', 'manufacturing', 'factory', 'school', 'hospital',
+                   'hotel', 'retail', 'restaurant', 'mall', 'warehouse')
+ENERGY_KEYWORD_SET = frozenset(ENERGY_KEYWORDS)
+ENERGY_PATTERN = '|'.join(map(re.escape, ENERGY_KEYWORDS))
+ENERGY_RE = re.compile(ENERGY_PATTERN)
+
+# Building ages are measured against the year the run started
+CURRENT_YEAR = datetime.now().year
+
+# Points for a building older than each age in years, checked oldest first
+AGE_POINTS = ((30, 20), (20, 15), (10, 10))
+
+# Points for the first size label found in a building size
+SIZE_POINTS = (('large', 15), ('medium', 10), ('small', 5))
+
+# Slotted instances drop the per-instance __dict__ (dataclass slots need Python 3.10+)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Company:
     """Company data model"""
     
@@ -35,36 +60,40 @@ class Company:
     scraped_at: datetime = field(default_factory=datetime.now)
     notes: str = ""
     
+    # Field names, computed once for filtering incoming dictionaries and building outgoing ones
+    _FIELD_NAMES = tuple(__annotations__)
+    _FIELDS = frozenset(_FIELD_NAMES)
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Company':
         """Create a Company instance from a dictionary"""
-        # Copy the dictionary to avoid modifying the original
-        company_data = data.copy()
+        # Keep only the fields the class has; this builds a new dict, so the input is left untouched
+        filtered_data = {k: data[k] for k in cls._FIELDS if k in data}
         
         # Convert scraped_at to datetime if it's a string
-        if isinstance(company_data.get('scraped_at'), str):
+        scraped_at = filtered_data.get('scraped_at')
+        if type(scraped_at) is str:
+            # Only a trailing Z needs rewriting for fromisoformat
+            if scraped_at.endswith('Z'):
+                scraped_at = scraped_at[:-1] + '+00:00'
             try:
-                company_data['scraped_at'] = datetime.fromisoformat(company_data['scraped_at'].replace('Z', '+00:00'))
+                filtered_data['scraped_at'] = datetime.fromisoformat(scraped_at)
             except (ValueError, TypeError):
-                company_data['scraped_at'] = datetime.now()
+                filtered_data['scraped_at'] = datetime.now()
         
         # Convert lead_score to int if it's a string
-        if isinstance(company_data.get('lead_score'), str):
+        if isinstance(filtered_data.get('lead_score'), str):
             try:
-                company_data['lead_score'] = int(company_data['lead_score'])
+                filtered_data['lead_score'] = int(filtered_data['lead_score'])
             except (ValueError, TypeError):
-                company_data['lead_score'] = 50
-        
-        # Remove any fields that aren't in the class
-        valid_fields = cls.__annotations__.keys()
-        filtered_data = {k: v for k, v in company_data.items() if k in valid_fields}
+                filtered_data['lead_score'] = 50
         
         return cls(**filtered_data)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert Company instance to a dictionary"""
         # Convert datetime to string
-        company_dict = self.__dict__.copy()
+        company_dict = {name: getattr(self, name) for name in self._FIELD_NAMES}
         if isinstance(company_dict.get('scraped_at'), datetime):
             company_dict['scraped_at'] = company_dict['scraped_at'].isoformat()
         
@@ -75,31 +104,11 @@ class Company:
         score = 50  # Base score
         
         # Building age
-        if self.year_built:
-            try:
-                year = int(self.year_built)
-                current_year = datetime.now().year
-                age = current_year - year
-                
-                if age > 30:
-                    score += 20
-                elif age > 20:
-                    score += 15
-                elif age > 10:
-                    score += 10
-            except (ValueError, TypeError):
-                pass
+        score += age_score(self.year_built)
         
         # Building size
         if self.building_size:
-            size_text = self.building_size.lower()
-            
-            if 'large' in size_text:
-                score += 15
-            elif 'medium' in size_text:
-                score += 10
-            elif 'small' in size_text:
-                score += 5
+            score += size_score(self.building_size)
         
         # Website available (indicates established business)
         if self.website:
@@ -117,19 +126,45 @@ class Company:
         if self.description:
             score += 5
         
+        # Already at the cap, so the category can't change the result
+        if score >= 100:
+            return 100
+        
         # Category/Services
         if self.category:
-            category = self.category.lower()
-            
-            # Add points for promising categories
-            energy_keywords = ['energy', 'utilities', 'building', 'property', 'office', 'commercial', 
-                              'industrial', 'manufacturing', 'factory', 'school', 'hospital',
-                              'hotel', 'retail', 'restaurant', 'mall', 'warehouse']
-            
-            for keyword in energy_keywords:
-                if keyword in category:
-                    score += 5
-                    break
+            score += _category_score(self.category)
         
         # Cap score at 100
-        return min(score, 100)
\ No newline at end of file
+        return min(score, 100)
+
+def age_points(age: int) -> int:
+    """Points for a building of this age"""
+    for min_age, points in AGE_POINTS:
+        if age > min_age:
+            return points
+    return 0
+
+@lru_cache(maxsize=1024)
+def age_score(year_built) -> int:
+    """Score a year built once per distinct value; values int() rejects score nothing"""
+    if not year_built:
+        return 0
+    try:
+        return age_points(CURRENT_YEAR - int(year_built))
+    except (ValueError, TypeError):
+        return 0
+
+@lru_cache(maxsize=1024)
+def size_score(building_size: str, points: Tuple[Tuple[str, int], ...] = SIZE_POINTS) -> int:
+    """Score a building size once; the same size labels repeat across companies"""
+    size_text = building_size.lower()
+    for label, label_points in points:
+        if label in size_text:
+            return label_points
+    return 0
+
+@lru_cache(maxsize=4096)
+def _category_score(category: str) -> int:
+    """Score a category once; the same categories repeat across companies"""
+    # Add points for promising categories
+    return 5 if ENERGY_RE.search(category.lower()) else 0
@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
 # scrapers/__init__.py - Scrapers package initialization
 
-from scrapers.base_scraper import BaseScraper
-from scrapers.yellowpages_scraper import YellowPagesScraper
-from scrapers.googlemaps_scraper import GoogleMapsScraper
+# Scrapers import Selenium, so they are loaded on first access rather than with the package
+_SCRAPER_MODULES = {
+    'BaseScraper': 'scrapers.base_scraper',
+    'YellowPagesScraper': 'scrapers.yellowpages_scraper',
+    'GoogleMapsScraper': 'scrapers.googlemaps_scraper'
+}
 
-__all__ = ['BaseScraper', 'YellowPagesScraper', 'GoogleMapsScraper']
\ No newline at end of file
+__all__ = ['BaseScraper', 'YellowPagesScraper', 'GoogleMapsScraper']
+
+def __getattr__(name):
+    """Import a scraper class the first time it's used"""
+    if name in _SCRAPER_MODULES:
+        import importlib
+        return getattr(importlib.import_module(_SCRAPER_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,13 +3,31 @@
 
 import time
 import random
+import re
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
-from selenium.webdriver.chrome.webdriver import WebDriver
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 
-from config import SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX, BATCH_SIZE, logger
+import numpy as np
+import pandas as pd
+
+from config import SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX, DETAIL_WORKERS, SOURCE_CONCURRENCY, logger
 from database import Database
-from utils.selenium_utils import setup_selenium
+from models.company import ENERGY_KEYWORDS, ENERGY_RE, age_score, size_score
+from utils.console import create_progress
+
+# Selenium is only needed once a scraper actually runs
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
+# Common business suffixes ignored when comparing names
+_SUFFIX_RE = re.compile(r'\s+(?:inc|llc|corp|company|co|ltd)\b')
+
+# Per-source limits on concurrent detail page loads, shared by every scraper instance
+_source_semaphores = {}
+_source_semaphores_lock = threading.Lock()
 
 class BaseScraper(ABC):
     """Abstract base class for scrapers"""
@@ -17,18 +35,30 @@ class BaseScraper(ABC):
     def __init__(self, db: Database):
         """Initialize the scraper"""
         self.db = db
-        self.driver = None
+        self._driver = None
         self.source_name = self.__class__.__name__
     
+    @property
+    def driver(self) -> 'WebDriver':
+        """The scraper's Selenium driver, borrowed from the warm pool the first time it's used"""
+        # Searches served over plain HTTP never touch this, so they never start Chrome
+        if self._driver is None:
+            from utils.selenium_utils import acquire_driver
+            self._driver = acquire_driver()
+            # Rely purely on explicit waits so they don't interact with an implicit timeout
+            self._driver.implicitly_wait(0)
+        return self._driver
+    
     def __enter__(self):
-        """Setup for context manager - initialize Selenium"""
-        self.driver = setup_selenium()
+        """Setup for context manager - the Selenium driver is borrowed on first use"""
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Cleanup for context manager - close Selenium"""
-        if self.driver:
-            self.driver.quit()
+        """Cleanup for context manager - return Selenium driver to the pool"""
+        if self._driver:
+            from utils.selenium_utils import release_driver
+            release_driver(self._driver)
+            self._driver = None
     
     @abstractmethod
     def search_businesses(self, city: str, state: str, category: str = None, max_results: int = 20) -> List[Dict[str, Any]]:
@@ -36,63 +66,111 @@ class BaseScraper(ABC):
         pass
     
     @abstractmethod
-    def get_business_details(self, company: Dict[str, Any]) -> Dict[str, Any]:
-        """Get detailed information about a business"""
+    def get_business_details(self, company: Dict[str, Any], driver: 'WebDriver' = None) -> Dict[str, Any]:
+        """Get detailed information about a business, on the given driver or the scraper's own"""
         pass
     
     def get_business_details_batch(self, companies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Get detailed information for a batch of businesses"""
-        results = []
-        for i, company in enumerate(companies):
-            # Add a delay to avoid rate limiting
-            if i > 0:
-                time.sleep(random.uniform(SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX))
-                
-            try:
-                # Check cache first
-                cache_key = f"company_details_{self.source_name}_{company.get('name')}_{company.get('city')}_{company.get('state')}"
-                cached_details = self.db.cache_get(cache_key)
-                
-                if cached_details:
-                    logger.info(f"Using cached details for {company.get('name')}")
-                    results.append({**company, **cached_details})
-                    continue
-                
-                # Get details and add to cache
-                detailed_company = self.get_business_details(company)
-                self.db.cache_set(cache_key, detailed_company)
-                results.append(detailed_company)
-                
-            except Exception as e:
-                logger.error(f"Error getting details for {company.get('name')}: {e}")
-                results.append(company)  # Keep original data
-                
-            # Process in smaller batches to reduce memory usage
-            if i > 0 and i % BATCH_SIZE == 0:
-                logger.info(f"Processed {i}/{len(companies)} businesses")
+        """Get detailed information for a batch of businesses, several at a time"""
+        results = list(companies)
+        if not companies:
+            return results
+        
+        # Look up every company's cached details in one query
+        cache_keys = [self._details_cache_key(company) for company in companies]
+        cached = self.db.cache_get_many(cache_keys)
+        
+        misses = []
+        for i, (company, cache_key) in enumerate(zip(companies, cache_keys)):
+            if cache_key in cached:
+                merged = company.copy()
+                merged.update(cached[cache_key])
+                results[i] = merged
+            else:
+                misses.append(i)
+        
+        if len(misses) < len(companies):
+            logger.info(f"Using cached details for {len(companies) - len(misses)} businesses")
+        if not misses:
+            return results
+        
+        # Create progress display
+        progress, task = create_progress(f"Getting business details...", len(misses))
+        fetched = {}
+        
+        # Politeness delays for every fetch, drawn up front; each worker thread paces itself
+        delays = [random.uniform(SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX) for _ in misses]
+        pacing = threading.local()
+        
+        with progress:
+            # Detail lookups are I/O-bound, so each worker drives its own browser
+            with ThreadPoolExecutor(max_workers=min(DETAIL_WORKERS, len(misses))) as executor:
+                futures = {
+                    executor.submit(self._get_business_details_worker, companies[i], delay, pacing): i
+                    for i, delay in zip(misses, delays)
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    detailed_company = future.result()
+                    if detailed_company is not None:
+                        results[i] = detailed_company
+                        fetched[cache_keys[i]] = detailed_company
+                    progress.update(task, advance=1)
+        
+        # Cache the new details in one transaction
+        self.db.cache_set_many(fetched)
         
         return results
     
+    def _get_business_details_http(self, company: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get detailed information over plain HTTP, or None when a browser is needed - can be overridden by subclass"""
+        return None
+    
+    def _details_cache_key(self, company: Dict[str, Any]) -> str:
+        """Cache key for a business's scraped details"""
+        return f"company_details_{self.source_name}_{company.get('name')}_{company.get('city')}_{company.get('state')}"
+    
+    def _source_semaphore(self) -> threading.Semaphore:
+        """Return the semaphore limiting concurrent page loads against this scraper's site"""
+        with _source_semaphores_lock:
+            if self.source_name not in _source_semaphores:
+                _source_semaphores[self.source_name] = threading.Semaphore(SOURCE_CONCURRENCY)
+            return _source_semaphores[self.source_name]
+    
+    def _get_business_details_worker(self, company: Dict[str, Any], delay: float,
+                                     pacing: threading.local) -> Optional[Dict[str, Any]]:
+        """Get details for one uncached business of a batch on a pooled driver, or None on failure"""
+        from utils.selenium_utils import get_driver
+        
+        # Keep this thread's page loads at least `delay` apart to avoid rate limiting;
+        # time spent on the previous fetch counts toward the gap
+        now = time.monotonic()
+        next_allowed = getattr(pacing, 'next_allowed', now)
+        if now < next_allowed:
+            time.sleep(next_allowed - now)
+        pacing.next_allowed = max(now, next_allowed) + delay
+        
+        try:
+            # Get details politely for the site, on a driver of our own unless the
+            # source can serve them without a browser
+            with self._source_semaphore():
+                detailed_company = self._get_business_details_http(company)
+                if detailed_company is not None:
+                    return detailed_company
+                
+                with get_driver() as driver:
+                    return self.get_business_details(company, driver)
+            
+        except Exception as e:
+            logger.error(f"Error getting details for {company.get('name')}: {e}")
+            return None  # Caller keeps original data
+    
     def calculate_lead_score(self, company: Dict[str, Any]) -> int:
         """Calculate a lead score for a company - can be overridden by subclass"""
         score = 50  # Base score
         
         # Building age
-        if company.get('year_built'):
-            try:
-                from datetime import datetime
-                year = int(company['year_built'])
-                current_year = datetime.now().year
-                age = current_year - year
-                
-                if age > 30:
-                    score += 20
-                elif age > 20:
-                    score += 15
-                elif age > 10:
-                    score += 10
-            except (ValueError, TypeError):
-                pass
+        score += age_score(company.get('year_built'))
         
         # Website available (indicates established business)
         if company.get('website'):
@@ -112,43 +190,61 @@ class BaseScraper(ABC):
         
         # Building size if available
         if company.get('building_size'):
-            size_text = str(company['building_size']).lower()
-            if 'large' in size_text:
-                score += 15
-            elif 'medium' in size_text:
-                score += 10
-            elif 'small' in size_text:
-                score += 5
+            score += size_score(str(company['building_size']))
+        
+        # Already at the cap, so the keyword scan can't change the result
+        if score >= 100:
+            return 100
         
         # Energy-related keywords in description or category
-        energy_keywords = ['energy', 'utilities', 'building', 'property', 'office', 'commercial', 
-                          'industrial', 'manufacturing', 'factory', 'school', 'hospital',
-                          'hotel', 'retail', 'restaurant', 'mall', 'warehouse']
+        score += _keyword_score(f"{company.get('description', '')} {company.get('category', '')}")
         
-        text_to_check = ' '.join([
-            str(company.get('description', '')).lower(),
-            str(company.get('category', '')).lower()
-        ])
+        # Cap score at 100
+        return min(score, 100)
+    
+    def score_batch(self, companies: List[Dict[str, Any]]) -> List[int]:
+        """Calculate lead scores for many companies at once (same rules as calculate_lead_score)"""
+        if not companies:
+            return []
         
-        keyword_matches = sum(1 for keyword in energy_keywords if keyword in text_to_check)
-        score += min(keyword_matches * 3, 15)  # Max 15 points for keywords
+        df = pd.DataFrame(companies)
+        
+        def text(column):
+            # Treat missing and None alike, as the per-company scorer does
+            if column not in df:
+                return pd.Series('', index=df.index)
+            return df[column].fillna('').astype(str)
+        
+        # Building age; years repeat, so parse each distinct value once, exactly as calculate_lead_score does
+        scores = pd.Series(50, index=df.index)
+        if 'year_built' in df:
+            scores += df['year_built'].map(age_score)
+        
+        # Website, contact details, email or phone, and description
+        scores += (10 * text('website').astype(bool)
+                   + 10 * (text('contact_person').astype(bool) | text('contact_title').astype(bool))
+                   + 5 * (text('email').astype(bool) | text('phone').astype(bool))
+                   + 5 * text('description').astype(bool))
+        
+        # Building size labels repeat, so score each distinct one once
+        scores += text('building_size').map(size_score)
+        
+        # Energy-related keywords in description or category, each distinct keyword counted once
+        keyword_text = (text('description') + ' ' + text('category')).str.lower()
+        keyword_hits = sum(keyword_text.str.contains(keyword, regex=False) for keyword in ENERGY_KEYWORDS)
+        scores += np.minimum(3 * keyword_hits, 15)
         
         # Cap score at 100
-        return min(score, 100)
+        return scores.clip(upper=100).astype(int).tolist()
     
     @staticmethod
     def similar_names(name1: str, name2: str) -> bool:
         """Check if two business names are similar"""
-        name1 = name1.lower()
-        name2 = name2.lower()
-        
-        # Remove common business suffixes
-        for suffix in [' inc', ' llc', ' corp', ' company', ' co', ' ltd']:
-            name1 = name1.replace(suffix, '')
-            name2 = name2.replace(suffix, '')
+        name1 = _normalize_name(name1)
+        name2 = _normalize_name(name2)
         
         # Compare cleaned names
-        return name1.strip() == name2.strip() or name1.strip() in name2.strip() or name2.strip() in name1.strip()
+        return name1 == name2 or name1 in name2 or name2 in name1
     
     def add_source_info(self, company: Dict[str, Any]) -> Dict[str, Any]:
         """Add source information to company data"""
@@ -158,4 +254,15 @@ class BaseScraper(ABC):
         if 'lead_score' not in company:
             company['lead_score'] = self.calculate_lead_score(company)
             
-        return company
\ No newline at end of file
+        return company
+
+@lru_cache(maxsize=4096)
+def _normalize_name(name: str) -> str:
+    """Lowercase a business name and remove common business suffixes, once per distinct name"""
+    return _SUFFIX_RE.sub('', name.lower()).strip()
+
+@lru_cache(maxsize=8192)
+def _keyword_score(text: str) -> int:
+    """Score energy-related keywords once per distinct text, found in a single regex pass"""
+    keyword_matches = len(set(ENERGY_RE.findall(text.lower())))
+    return min(keyword_matches * 3, 15)  # Max 15 points for keywords
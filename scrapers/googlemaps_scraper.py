@@ -4,19 +4,67 @@
 import time
 import random
 import re
+from functools import lru_cache
 from typing import List, Dict, Any
 
+import numpy as np
+import pandas as pd
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
 
-from config import GOOGLE_MAPS_BASE_URL, SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX, logger
+from config import GOOGLE_MAPS_BASE_URL, SCRAPE_JITTER, SCRAPE_JITTER_MIN, SCRAPE_JITTER_MAX, logger
+from models.company import ENERGY_KEYWORD_SET, ENERGY_PATTERN, ENERGY_RE
 from scrapers.base_scraper import BaseScraper
-from utils.selenium_utils import (
-    wait_for_element, wait_for_elements, safe_click, scroll_down,
-    get_text_safely, get_attribute_safely
-)
+from utils.selenium_utils import wait_for_element, safe_click, auto_scroll, navigate
 from utils.console import create_progress
 
+# Splits "street, city, ST 12345" into its parts
+_ADDRESS_RE = re.compile(r"(.*?),\s*(.*?),\s*(\w{2})\s*(\d{5})?")
+
+# Base-score contribution for every website/address/phone/description presence combination,
+# indexed by the 4-bit mask built in score_batch
+_PRESENCE_LUT = np.array([10 * w + 10 * a + 5 * p + 5 * d
+                          for w in (0, 1) for a in (0, 1) for p in (0, 1) for d in (0, 1)],
+                         dtype=np.int16)
+
+# Locators used with WebDriver, built once as (By, selector) pairs
+_SEL_RESULT = (By.CSS_SELECTOR, ".section-result")
+_SEL_HERO_TITLE = (By.CSS_SELECTOR, "h1.section-hero-header-title-title")
+_SEL_BACK_BUTTON = (By.CSS_SELECTOR, "button.section-back-to-list-button")
+
+# Fields worth opening a result's details panel for when missing from its card
+DETAIL_FIELDS = ('name', 'address', 'phone', 'website')
+
+# Reads the fields a result card already carries, so most results need no click
+EXTRACT_CARD_INFO_JS = """
+const card = arguments[0];
+const r = {};
+const text = (sel) => { const e = card.querySelector(sel); return e ? (e.innerText || '').trim() : ''; };
+const name = text(".section-result-title"); if (name) r.name = name;
+const category = text(".section-result-details"); if (category) r.category = category;
+const address = text(".section-result-location"); if (address) r.address = address;
+const phone = text(".section-result-phone-number"); if (phone) r.phone = phone;
+const site = card.querySelector("a.section-result-action-icon-container[href]");
+if (site && site.href) r.website = site.href;
+const place = card.querySelector("a[href*='/maps/place/']");
+if (place && place.href) r.place_url = place.href;
+return r;
+"""
+
+# Extracts every details-panel field in one WebDriver round-trip instead of one per selector
+EXTRACT_BUSINESS_INFO_JS = """
+const r = {};
+const text = (sel) => { const e = document.querySelector(sel); return e ? (e.innerText || '').trim() : null; };
+const name = text("h1.section-hero-header-title-title"); if (name !== null) r.name = name;
+const address = text("button[data-item-id='address']"); if (address !== null) r.address = address;
+const phone = text("button[data-item-id='phone:tel']"); if (phone !== null) r.phone = phone;
+const site = document.querySelector("a[data-item-id='authority']");
+if (site) r.website = (site.getAttribute('href') ? site.href : '').trim();
+const category = text("button[jsaction='pane.rating.category']"); if (category !== null) r.category = category;
+const description = text(".section-editorial-quote"); if (description !== null) r.description = description;
+r.reviews = Array.from(document.querySelectorAll(".section-rating-term-list")).map(e => (e.innerText || '').trim());
+return r;
+"""
+
 class GoogleMapsScraper(BaseScraper):
     """Scrapes business data from Google Maps"""
     
@@ -24,9 +72,16 @@ class GoogleMapsScraper(BaseScraper):
         super().__init__(db)
         self.source_name = "Google Maps"
     
-    def search_businesses(self, city: str, state: str, category: str = None, max_results: int = 20) -> List[Dict[str, Any]]:
-        """Search for businesses in a specific city and category"""
+    def search_businesses(self, city: str, state: str, category: str = None, max_results: int = 20,
+                          get_details: bool = False) -> List[Dict[str, Any]]:
+        """Search for businesses in a specific city and category
+        
+        Results are read from the list cards; with get_details, a result's details
+        panel is opened only when its card lacks one of DETAIL_FIELDS. Panels with a
+        direct place link are loaded afterwards, several at once on pooled drivers.
+        """
         companies = []
+        needs_details = []
         
         try:
             # Format search query
@@ -43,73 +98,85 @@ class GoogleMapsScraper(BaseScraper):
             
             logger.info(f"Searching Google Maps: {search_url}")
             
-            # Navigate to search page
-            self.driver.get(search_url)
-            
-            # Wait for results to load
-            time.sleep(3)  # Initial wait for results
+            # Navigate to search page and wait for results to load
+            navigate(self.driver, search_url, *_SEL_RESULT, timeout=10)
             
             results_found = 0
             
             # Create progress display
             progress, task = create_progress(f"Scraping business data...", max_results)
             
+            # Result elements already handled, and fingerprints of the businesses they showed;
+            # Maps re-renders overlapping results while scrolling
+            processed = 0
+            seen = set()
+            
             with progress:
-                # Use JavaScript to scroll through results
-                last_height = self.driver.execute_script(
-                    "return document.querySelector('.section-layout.section-scrollbox').scrollHeight"
-                )
+                # Scrolling runs as a single async script, allow it time to settle
+                self.driver.set_script_timeout(30)
                 
                 while results_found < max_results:
                     # Get all result elements
-                    result_elements = self.driver.find_elements(By.CSS_SELECTOR, ".section-result")
+                    result_elements = self.driver.find_elements(*_SEL_RESULT)
                     
                     # Process visible results
-                    for element in result_elements[results_found:]:
+                    for element in result_elements[processed:]:
                         if results_found >= max_results:
                             break
+                        processed += 1
                             
                         try:
-                            # Click on the result to see details
-                            safe_click(self.driver, element)
+                            # Read what the result card already shows without leaving the list
+                            company = self._extract_from_card(element)
                             
-                            # Wait for details panel to load
-                            time.sleep(2)
+                            # Skip businesses already seen in an earlier, overlapping render
+                            fingerprint = company.get('place_url') or (company.get('name'), company.get('address'))
+                            if fingerprint in seen:
+                                continue
+                            seen.add(fingerprint)
                             
-                            # Extract information from details panel
-                            company = self._extract_business_info()
+                            # Only open the details panel when the card is missing fields we want;
+                            # panels with their own place link are fetched in parallel afterwards
+                            missing_details = get_details and not all(company.get(field) for field in DETAIL_FIELDS)
+                            deferred = missing_details and bool(company.get('place_url'))
+                            if missing_details and not deferred:
+                                # Click on the result to see details
+                                safe_click(self.driver, element)
+                                
+                                # Wait for details panel to load
+                                wait_for_element(self.driver, *_SEL_HERO_TITLE, timeout=5)
+                                
+                                # Details panel values take precedence over the card's partial ones
+                                company.update({key: value for key, value in self._extract_business_info().items() if value})
+                                
+                                # Go back to results
+                                self._go_back()
+                                
+                                # Optional jitter to avoid anti-bot throttling
+                                if SCRAPE_JITTER:
+                                    time.sleep(random.uniform(SCRAPE_JITTER_MIN, SCRAPE_JITTER_MAX))
                             
                             # Add location if not found in details
                             if 'city' not in company:
                                 company['city'] = city
                                 company['state'] = state
                             
-                            # Add source and calculate lead score
-                            company = self.add_source_info(company)
+                            # Add source; lead scores are computed for the whole batch below
+                            company.setdefault('source', self.source_name)
                             
                             # Add to results if we got a name
                             if company.get('name'):
+                                if deferred:
+                                    needs_details.append(len(companies))
                                 companies.append(company)
                                 results_found += 1
                                 progress.update(task, advance=1)
                             
-                            # Go back to results
-                            back_button = self.driver.find_elements(By.CSS_SELECTOR, "button.section-back-to-list-button")
-                            if back_button:
-                                safe_click(self.driver, back_button[0])
-                                time.sleep(1)
-                            
-                            # Small sleep to avoid overloading
-                            time.sleep(random.uniform(SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX))
-                            
                         except Exception as e:
                             logger.error(f"Error processing business element: {e}")
                             # Try to go back to results
                             try:
-                                back_button = self.driver.find_elements(By.CSS_SELECTOR, "button.section-back-to-list-button")
-                                if back_button:
-                                    safe_click(self.driver, back_button[0])
-                                    time.sleep(1)
+                                self._go_back()
                             except Exception:
                                 pass
                             continue
@@ -118,48 +185,67 @@ class GoogleMapsScraper(BaseScraper):
                     if results_found >= max_results:
                         break
                     
-                    # Scroll down to load more results
-                    self.driver.execute_script(
-                        "document.querySelector('.section-layout.section-scrollbox').scrollTo(0, document.querySelector('.section-layout.section-scrollbox').scrollHeight);"
-                    )
-                    time.sleep(2)
-                    
-                    # Check if we've reached the end of the scroll
-                    new_height = self.driver.execute_script(
-                        "return document.querySelector('.section-layout.section-scrollbox').scrollHeight"
-                    )
-                    
-                    if new_height == last_height:
+                    # Scroll down to load more results; if none were added we've reached the end
+                    wanted = processed + max_results - results_found
+                    loaded = auto_scroll(self.driver, ".section-layout.section-scrollbox", ".section-result", wanted)
+                    if not loaded or loaded <= len(result_elements):
                         # No more results
                         break
-                    
-                    last_height = new_height
             
             # Record search in database
             self.db.record_search("Google Maps", f"{category} in {city}, {state}", len(companies))
             
-            return companies
-            
         except Exception as e:
             logger.error(f"Error scraping Google Maps: {e}")
-            return companies
+        
+        # Open the remaining details panels concurrently, each on its own pooled driver
+        if needs_details:
+            detailed = self.get_business_details_batch([companies[i] for i in needs_details])
+            for i, company in zip(needs_details, detailed):
+                companies[i] = company
+        
+        # Place links only matter while scraping
+        for company in companies:
+            company.pop('place_url', None)
+        
+        # Score everything we collected in one vectorized pass
+        for company, score in zip(companies, self.score_batch(companies)):
+            company['lead_score'] = score
+        
+        return companies
+    
+    def _go_back(self):
+        """Return from a details panel to the results list"""
+        back_button = self.driver.find_elements(*_SEL_BACK_BUTTON)
+        if back_button:
+            safe_click(self.driver, back_button[0])
+            wait_for_element(self.driver, *_SEL_RESULT, timeout=5)
+    
+    def _extract_from_card(self, element) -> Dict[str, Any]:
+        """Extract the business information shown on a search result card"""
+        try:
+            return self.driver.execute_script(EXTRACT_CARD_INFO_JS, element) or {}
+        except Exception as e:
+            logger.error(f"Error extracting result card info: {e}")
+            return {}
     
-    def _extract_business_info(self) -> Dict[str, Any]:
+    def _extract_business_info(self, driver=None) -> Dict[str, Any]:
         """Extract business information from Google Maps details panel"""
         company = {}
+        driver = driver or self.driver
         
         try:
-            # Extract name
-            name_element = self.driver.find_elements(By.CSS_SELECTOR, "h1.section-hero-header-title-title")
-            if name_element:
-                company['name'] = get_text_safely(name_element[0])
+            # Query every field inside the browser in a single round-trip
+            details = driver.execute_script(EXTRACT_BUSINESS_INFO_JS) or {}
+            
+            if 'name' in details:
+                company['name'] = details['name']
             
             # Extract address
-            address_element = self.driver.find_elements(By.CSS_SELECTOR, "button[data-item-id='address']")
-            if address_element:
-                full_address = get_text_safely(address_element[0])
+            if 'address' in details:
+                full_address = details['address']
                 # Try to parse city, state, zip
-                match = re.search(r"(.*?),\s*(.*?),\s*(\w{2})\s*(\d{5})?", full_address)
+                match = _ADDRESS_RE.search(full_address)
                 if match:
                     company['address'] = match.group(1).strip()
                     company['city'] = match.group(2).strip()
@@ -168,37 +254,14 @@ class GoogleMapsScraper(BaseScraper):
                 else:
                     company['address'] = full_address
             
-            # Extract phone
-            phone_element = self.driver.find_elements(By.CSS_SELECTOR, "button[data-item-id='phone:tel']")
-            if phone_element:
-                company['phone'] = get_text_safely(phone_element[0])
-            
-            # Extract website
-            website_element = self.driver.find_elements(By.CSS_SELECTOR, "a[data-item-id='authority']")
-            if website_element:
-                company['website'] = get_attribute_safely(website_element[0], "href")
-            
-            # Extract categories/services
-            category_element = self.driver.find_elements(By.CSS_SELECTOR, "button[jsaction='pane.rating.category']")
-            if category_element:
-                company['category'] = get_text_safely(category_element[0])
-            
-            # Extract description from reviews or other text
-            description_element = self.driver.find_elements(By.CSS_SELECTOR, ".section-editorial-quote")
-            if description_element:
-                company['description'] = get_text_safely(description_element[0])
-            
-            # Extract reviews (optional)
-            reviews_element = self.driver.find_elements(By.CSS_SELECTOR, ".section-rating-term-list")
-            if reviews_element:
-                review_points = []
-                for review in reviews_element:
-                    review_text = get_text_safely(review)
-                    if review_text:
-                        review_points.append(review_text)
-                
-                if review_points and not company.get('description'):
-                    company['description'] = "Customer reviews highlight: " + "; ".join(review_points)
+            for key in ('phone', 'website', 'category', 'description'):
+                if key in details:
+                    company[key] = details[key]
+            
+            # Reviews (optional) fill in a missing description
+            review_points = [review for review in details.get('reviews', []) if review]
+            if review_points and not company.get('description'):
+                company['description'] = "Customer reviews highlight: " + "; ".join(review_points)
             
             return company
             
@@ -206,46 +269,75 @@ class GoogleMapsScraper(BaseScraper):
             logger.error(f"Error extracting business info: {e}")
             return company
     
-    def get_business_details(self, company: Dict[str, Any]) -> Dict[str, Any]:
-        """Get detailed information about a business"""
-        # Google Maps doesn't have separate detail pages, so we already
-        # have all the information we can get from the search results
-        # This method remains for compatibility with the BaseScraper interface
-        return company
+    def get_business_details(self, company: Dict[str, Any], driver=None) -> Dict[str, Any]:
+        """Get detailed information about a business from its place page"""
+        # Without a place link, the search results are all we have
+        if not company.get('place_url'):
+            return company
+        
+        # Batch lookups run in parallel, each on its own driver
+        driver = driver or self.driver
+        
+        try:
+            navigate(driver, company['place_url'], *_SEL_HERO_TITLE, timeout=10)
+            
+            # Details panel values take precedence over the card's partial ones
+            detailed_company = company.copy()
+            detailed_company.update({key: value for key, value in self._extract_business_info(driver).items() if value})
+            return detailed_company
+            
+        except Exception as e:
+            logger.error(f"Error getting business details: {e}")
+            return company
     
-    def calculate_lead_score(self, company: Dict[str, Any]) -> int:
-        """Calculate a lead score based on available information"""
-        score = 50  # Base score
+    def score_batch(self, companies: List[Dict[str, Any]]) -> List[int]:
+        """Calculate lead scores for many companies at once (same rules as calculate_lead_score)"""
+        if not companies:
+            return []
+        
+        df = pd.DataFrame(companies)
         
-        # Website available (indicates established business)
-        if company.get('website'):
-            score += 10
+        def present(column):
+            # Treat missing, None and empty strings alike, as the per-company scorer does
+            if column not in df:
+                return np.zeros(len(df), dtype=np.uint8)
+            return df[column].fillna('').astype(bool).to_numpy(dtype=np.uint8)
         
-        # Address available
-        if company.get('address'):
-            score += 10
+        # Pack field presence into a 4-bit mask and look up its contribution in one gather
+        mask = (present('website') << 3) | (present('address') << 2) | (present('phone') << 1) | present('description')
+        scores = pd.Series(50 + _PRESENCE_LUT[mask], index=df.index)
         
-        # Phone available
-        if company.get('phone'):
-            score += 5
+        if 'category' in df:
+            categories = df['category'].fillna('').astype(str).str.lower()
+            scores += 10 * categories.str.contains(ENERGY_PATTERN, regex=True)
         
-        # Description available
-        if company.get('description'):
-            score += 5
+        return scores.clip(upper=100).astype(int).tolist()
+    
+    def calculate_lead_score(self, company: Dict[str, Any]) -> int:
+        """Calculate a lead score based on available information"""
+        # Base score, plus points for a website (established business), address, phone and description
+        score = (50
+                 + 10 * bool(company.get('website'))
+                 + 10 * bool(company.get('address'))
+                 + 5 * bool(company.get('phone'))
+                 + 5 * bool(company.get('description')))
         
         # Category/Services
-        if company.get('category'):
-            category = company['category'].lower()
-            
-            # Add points for promising categories
-            energy_keywords = ['energy', 'utilities', 'building', 'property', 'office', 'commercial', 
-                              'industrial', 'manufacturing', 'factory', 'school', 'hospital',
-                              'hotel', 'retail', 'restaurant', 'mall', 'warehouse']
-            
-            for keyword in energy_keywords:
-                if keyword in category:
-                    score += 10
-                    break
+        category = company.get('category')
+        if category:
+            score += _category_score(category)
         
         # Cap score at 100
-        return min(score, 100)
\ No newline at end of file
+        return min(score, 100)
+
+@lru_cache(maxsize=4096)
+def _category_score(category: str) -> int:
+    """Score a category once; the same categories repeat across a city's results"""
+    category = category.strip().lower()
+    
+    # Single-word categories like "Hotel" are an exact hit, no scan needed
+    if category in ENERGY_KEYWORD_SET:
+        return 10
+    
+    # Add points for promising categories
+    return 10 if ENERGY_RE.search(category) else 0
@@ -1,25 +1,70 @@
 #!/usr/bin/env python3
 # scrapers/yellowpages_scraper.py - YellowPages scraper for LeadFinder
 
+import asyncio
+import atexit
+import threading
 import time
 import random
 import re
-import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from urllib.parse import urljoin
 
+import httpx
+from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
 
-from config import YELLOWPAGES_BASE_URL, SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX, logger
-from scrapers.base_scraper import BaseScraper
-from utils.selenium_utils import (
-    wait_for_element, wait_for_elements, safe_click, 
-    get_text_safely, get_attribute_safely
+from config import (
+    YELLOWPAGES_BASE_URL, SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX, SOURCE_CONCURRENCY, SELENIUM_USER_AGENT,
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, logger
 )
+from models.company import CURRENT_YEAR
+from scrapers.base_scraper import BaseScraper
+from utils.selenium_utils import wait_for_element, safe_click, navigate, get_texts_batch, extract_rows
 from utils.console import create_progress
 
+# Listing fields read from each search result, by CSS selector
+LISTING_SELECTORS = {
+    'name': ".business-name",
+    'address': ".street-address",
+    'locality': ".locality",
+    'phone': ".phones",
+    'categories': ".categories",
+    'years': ".years-in-business .number"
+}
+WEBSITE_SELECTOR = "a.track-visit-website"
+
+# Locators used with WebDriver, built once as (By, selector) pairs
+_SEL_SEARCH_RESULTS = (By.CSS_SELECTOR, ".search-results")
+_SEL_RESULT_NAME = (By.CSS_SELECTOR, ".result .business-name")
+_SEL_BUSINESS_CARD = (By.CSS_SELECTOR, ".business-card")
+_SEL_NEXT_PAGE = (By.CSS_SELECTOR, "a.next")
+
+# Search pages list this many businesses each
+LISTINGS_PER_PAGE = 30
+
+# Seconds to wait for a search page over plain HTTP
+PAGE_TIMEOUT = 15
+
+# Extracts every detail-page section in one WebDriver round-trip instead of one per element
+EXTRACT_DETAILS_JS = """
+const text = (e) => e ? (e.innerText || '').trim() : null;
+const next = (e, tag) => { let n = e.nextElementSibling; while (n && n.tagName !== tag) n = n.nextElementSibling; return n; };
+return {
+    description: text(document.querySelector(".business-description")),
+    services: Array.from(document.querySelectorAll(".services ul li")).map(text),
+    contacts: Array.from(document.querySelectorAll(".contact h2")).map(h => [text(h), text(next(h, 'P'))]),
+    about: Array.from(document.querySelectorAll(".about dt")).map(dt => [text(dt), text(next(dt, 'DD')) || ''])
+};
+"""
+
+# Keep-alive HTTP client for detail lookups, created on first use
+_http_client = None
+_http_client_lock = threading.Lock()
+
+# Splits "City, ST 12345" into its parts
+_LOCALITY_RE = re.compile(r"(.*?),\s*(\w{2})\s*(\d{5})?")
+
 class YellowPagesScraper(BaseScraper):
     """Scrapes business data from YellowPages.com"""
     
@@ -48,128 +93,17 @@ class YellowPagesScraper(BaseScraper):
             
             logger.info(f"Searching YellowPages: {search_url}")
             
-            # Navigate to search page
-            self.driver.get(search_url)
-            
-            # Wait for results to load
-            wait_for_element(self.driver, By.CLASS_NAME, "search-results", timeout=15)
+            # Search pages are server-rendered, so fetch them all at once over plain HTTP and
+            # only drive the browser if the site answers with a challenge instead of results
+            companies = self._search_with_http(search_url, city, state, category, max_results)
+            if companies is None:
+                logger.info("YellowPages search pages unavailable over HTTP, falling back to Selenium")
+                companies = []
+                self._search_with_selenium(search_url, city, state, category, max_results, companies)
             
-            results_found = 0
-            page = 1
-            
-            # Create progress display
-            progress, task = create_progress(f"Scraping business data...", max_results)
-            
-            with progress:
-                # While we still need more results and haven't hit an error
-                while results_found < max_results:
-                    # Get all business listings on current page
-                    business_elements = self.driver.find_elements(By.CLASS_NAME, "result")
-                    
-                    if not business_elements:
-                        logger.info("No more business results found")
-                        break
-                    
-                    # Process each business listing
-                    for element in business_elements:
-                        if results_found >= max_results:
-                            break
-                        
-                        try:
-                            company = {}
-                            
-                            # Extract business name
-                            name_element = element.find_elements(By.CLASS_NAME, "business-name")
-                            if name_element:
-                                company['name'] = get_text_safely(name_element[0])
-                            else:
-                                continue  # Skip if no name found
-                            
-                            # Extract address
-                            address_element = element.find_elements(By.CLASS_NAME, "street-address")
-                            if address_element:
-                                company['address'] = get_text_safely(address_element[0])
-                            
-                            # Extract locality (city, state, zip)
-                            locality_element = element.find_elements(By.CLASS_NAME, "locality")
-                            if locality_element:
-                                locality = get_text_safely(locality_element[0])
-                                # Try to parse city, state, zip
-                                match = re.match(r"(.*?),\s*(\w{2})\s*(\d{5})?", locality)
-                                if match:
-                                    company['city'] = match.group(1).strip()
-                                    company['state'] = match.group(2).strip()
-                                    company['zipcode'] = match.group(3) if match.group(3) else ""
-                            
-                            # If we couldn't parse from locality, use the provided city/state
-                            if 'city' not in company:
-                                company['city'] = city
-                                company['state'] = state
-                            
-                            # Extract phone
-                            phone_element = element.find_elements(By.CLASS_NAME, "phones")
-                            if phone_element:
-                                company['phone'] = get_text_safely(phone_element[0])
-                            
-                            # Extract website if available
-                            website_element = element.find_elements(By.CSS_SELECTOR, "a.track-visit-website")
-                            if website_element:
-                                company['website'] = get_attribute_safely(website_element[0], "href")
-                            
-                            # Extract categories/services
-                            categories_element = element.find_elements(By.CLASS_NAME, "categories")
-                            if categories_element:
-                                company['category'] = get_text_safely(categories_element[0])
-                            else:
-                                company['category'] = category
-                            
-                            # Extract years in business if available
-                            years_element = element.find_elements(By.CSS_SELECTOR, ".years-in-business .number")
-                            if years_element:
-                                years_in_business = get_text_safely(years_element[0])
-                                # Estimate year founded
-                                current_year = datetime.datetime.now().year
-                                try:
-                                    years = int(years_in_business)
-                                    company['year_built'] = str(current_year - years)
-                                except ValueError:
-                                    pass
-                            
-                            # Add source and calculate lead score
-                            company = self.add_source_info(company)
-                            
-                            # Add to results
-                            companies.append(company)
-                            results_found += 1
-                            progress.update(task, advance=1)
-                            
-                            # Small sleep to avoid overloading the server
-                            time.sleep(random.uniform(SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX))
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing business element: {e}")
-                            continue
-                    
-                    # Check if we have enough results
-                    if results_found >= max_results:
-                        break
-                    
-                    # Try to go to next page
-                    try:
-                        next_button = self.driver.find_elements(By.CSS_SELECTOR, "a.next")
-                        if next_button and "disabled" not in next_button[0].get_attribute("class"):
-                            safe_click(self.driver, next_button[0])
-                            page += 1
-                            
-                            # Wait for next page to load
-                            wait_for_element(self.driver, By.CLASS_NAME, "search-results", timeout=15)
-                            time.sleep(random.uniform(1, 2))
-                        else:
-                            logger.info("No more pages available")
-                            break
-                    except Exception as e:
-                        logger.error(f"Error navigating to next page: {e}")
-                        break
+            # Score everything we collected in one vectorized pass
+            for company, score in zip(companies, self.score_batch(companies)):
+                company['lead_score'] = score
             
             # Record search in database
             self.db.record_search("YellowPages", f"{category} in {city}, {state}", len(companies))
@@ -180,49 +114,188 @@ class YellowPagesScraper(BaseScraper):
             logger.error(f"Error scraping YellowPages: {e}")
             return companies
     
-    def get_business_details(self, company: Dict[str, Any]) -> Dict[str, Any]:
+    def _search_with_http(self, search_url: str, city: str, state: str, category: str,
+                          max_results: int) -> Optional[List[Dict[str, Any]]]:
+        """Fetch and parse every needed search page concurrently, or None if the site blocked us"""
+        pages_needed = -(-max_results // LISTINGS_PER_PAGE)
+        urls = [search_url] + [f"{search_url}?page={page}" for page in range(2, pages_needed + 1)]
+        bodies = asyncio.run(_fetch_pages(urls))
+        
+        # A missing or resultless first page means a captcha or JS challenge
+        if not bodies[0] or 'search-results' not in bodies[0]:
+            return None
+        
+        companies = []
+        for body in bodies:
+            listings = BeautifulSoup(body, "html.parser").select("div.result") if body else []
+            if not listings:
+                break
+            
+            for listing in listings:
+                if len(companies) >= max_results:
+                    return companies
+                
+                fields = {}
+                for field, selector in LISTING_SELECTORS.items():
+                    node = listing.select_one(selector)
+                    if node:
+                        fields[field] = node.get_text(" ", strip=True)
+                website = listing.select_one(WEBSITE_SELECTOR)
+                if website and website.get('href'):
+                    fields['website'] = urljoin(YELLOWPAGES_BASE_URL, website['href'])
+                
+                company = self._company_from_listing(fields, city, state, category)
+                if company:
+                    companies.append(company)
+        
+        return companies
+    
+    def _search_with_selenium(self, search_url: str, city: str, state: str, category: str,
+                              max_results: int, companies: List[Dict[str, Any]]) -> None:
+        """Page through search results in the browser, appending companies as they're found"""
+        # Navigate to search page and wait for results to load
+        navigate(self.driver, search_url, *_SEL_SEARCH_RESULTS, timeout=15)
+        
+        results_found = 0
+        page = 1
+        
+        # Create progress display
+        progress, task = create_progress(f"Scraping business data...", max_results)
+        
+        with progress:
+            # While we still need more results and haven't hit an error
+            while results_found < max_results:
+                # Read all business listings on current page at once
+                listings = extract_rows(self.driver, ".result", LISTING_SELECTORS, {'website': WEBSITE_SELECTOR})
+                
+                if not listings:
+                    logger.info("No more business results found")
+                    break
+                
+                # Process each business listing
+                for fields in listings:
+                    if results_found >= max_results:
+                        break
+                    
+                    try:
+                        if fields.get('website'):
+                            fields['website'] = urljoin(YELLOWPAGES_BASE_URL, fields['website'])
+                        
+                        company = self._company_from_listing(fields, city, state, category)
+                        if not company:
+                            continue  # Skip if no name found
+                        
+                        # Add to results
+                        companies.append(company)
+                        results_found += 1
+                        progress.update(task, advance=1)
+                        
+                        # Small sleep to avoid overloading the server
+                        time.sleep(random.uniform(SCRAPE_DELAY_MIN, SCRAPE_DELAY_MAX))
+                        
+                    except Exception as e:
+                        logger.error(f"Error processing business element: {e}")
+                        continue
+                
+                # Check if we have enough results
+                if results_found >= max_results:
+                    break
+                
+                # Try to go to next page
+                try:
+                    next_button = self.driver.find_elements(*_SEL_NEXT_PAGE)
+                    if next_button and "disabled" not in (next_button[0].get_dom_attribute("class") or ""):
+                        safe_click(self.driver, next_button[0])
+                        page += 1
+                        
+                        # Wait for next page to load
+                        wait_for_element(self.driver, *_SEL_SEARCH_RESULTS, timeout=15)
+                        time.sleep(random.uniform(1, 2))
+                    else:
+                        logger.info("No more pages available")
+                        break
+                except Exception as e:
+                    logger.error(f"Error navigating to next page: {e}")
+                    break
+    
+    def _company_from_listing(self, fields: Dict[str, str], city: str, state: str,
+                              category: str) -> Optional[Dict[str, Any]]:
+        """Build a company from the text of a search result's fields, or None if it has no name"""
+        if not fields.get('name'):
+            return None
+        
+        company = {'name': fields['name']}
+        
+        # Extract address
+        if 'address' in fields:
+            company['address'] = fields['address']
+        
+        # Try to parse city, state, zip from locality
+        match = _LOCALITY_RE.match(fields.get('locality', ''))
+        if match:
+            company['city'] = match.group(1).strip()
+            company['state'] = match.group(2).strip()
+            company['zipcode'] = match.group(3) if match.group(3) else ""
+        
+        # If we couldn't parse from locality, use the provided city/state
+        if 'city' not in company:
+            company['city'] = city
+            company['state'] = state
+        
+        # Extract phone and website if available
+        if 'phone' in fields:
+            company['phone'] = fields['phone']
+        if 'website' in fields:
+            company['website'] = fields['website']
+        
+        # Extract categories/services
+        company['category'] = fields.get('categories', category)
+        
+        # Estimate year founded from years in business
+        if 'years' in fields:
+            try:
+                company['year_built'] = str(CURRENT_YEAR - int(fields['years']))
+            except ValueError:
+                pass
+        
+        # Add source; lead scores are computed for the whole search below
+        company.setdefault('source', self.source_name)
+        return company
+    
+    def get_business_details(self, company: Dict[str, Any], driver=None) -> Dict[str, Any]:
         """Get detailed information about a business"""
         if not company.get('name') or not company.get('city'):
             return company
         
+        # Batch lookups run in parallel, each on its own driver
+        driver = driver or self.driver
+        
         try:
             # Construct search URL for specific business
-            business_name = company['name'].lower().replace(' ', '-')
-            city_state = f"{company['city'].lower().replace(' ', '-')}-{company['state'].lower()}"
-            search_url = f"{YELLOWPAGES_BASE_URL}/search?search_terms={business_name}&geo_location_terms={city_state}"
+            search_url = self._details_search_url(company)
             
             logger.info(f"Getting details for {company['name']}: {search_url}")
             
-            # Navigate to search page
-            self.driver.get(search_url)
-            
-            # Wait for results to load
-            try:
-                wait_for_element(self.driver, By.CLASS_NAME, "search-results", timeout=15)
-            except TimeoutException:
+            # Navigate to search page and wait for results to load
+            if navigate(driver, search_url, *_SEL_SEARCH_RESULTS, timeout=15) is None:
                 logger.warning(f"No results found for {company['name']}")
                 return company
             
-            # Find the first result that matches our business
-            business_elements = self.driver.find_elements(By.CLASS_NAME, "result")
+            # Find the first result that matches our business, reading every name at once
+            name_elements = driver.find_elements(*_SEL_RESULT_NAME)
             
-            for element in business_elements:
+            for name_element, found_name in zip(name_elements, get_texts_batch(driver, name_elements)):
                 try:
-                    name_element = element.find_elements(By.CLASS_NAME, "business-name")
-                    if not name_element:
-                        continue
-                    
                     # Check if this is the business we're looking for
-                    found_name = get_text_safely(name_element[0])
                     if self.similar_names(found_name, company['name']):
                         # Click on the business name to go to detail page
-                        safe_click(self.driver, name_element[0])
+                        safe_click(driver, name_element)
                         
                         # Wait for detail page to load
-                        wait_for_element(self.driver, By.CLASS_NAME, "business-card", timeout=15)
+                        wait_for_element(driver, *_SEL_BUSINESS_CARD, timeout=15)
                         
                         # Extract detailed information
-                        self._extract_business_details(company)
+                        self._extract_business_details(company, driver)
                         break
                 except Exception as e:
                     logger.error(f"Error processing search result: {e}")
@@ -234,60 +307,143 @@ class YellowPagesScraper(BaseScraper):
             logger.error(f"Error getting business details: {e}")
             return company
     
-    def _extract_business_details(self, company: Dict[str, Any]) -> None:
-        """Extract detailed business information from the detail page"""
-        try:
-            # Extract business description
-            description_element = self.driver.find_elements(By.CLASS_NAME, "business-description")
-            if description_element:
-                company['description'] = get_text_safely(description_element[0])
-            
-            # Extract services
-            services_elements = self.driver.find_elements(By.CSS_SELECTOR, ".services ul li")
-            if services_elements:
-                services = [get_text_safely(element) for element in services_elements]
-                if services:
-                    if 'category' in company:
-                        company['category'] = f"{company['category']}, {', '.join(services)}"
-                    else:
-                        company['category'] = ', '.join(services)
-            
-            # Extract contact information
-            contact_elements = self.driver.find_elements(By.CSS_SELECTOR, ".contact h2")
-            for element in contact_elements:
-                title = get_text_safely(element)
-                if title.lower() in ["owner", "manager", "president", "ceo"]:
-                    company['contact_title'] = title
-                    try:
-                        name_element = element.find_element(By.XPATH, "following-sibling::p")
-                        if name_element:
-                            company['contact_person'] = get_text_safely(name_element)
-                    except Exception:
-                        pass
+    def _get_business_details_http(self, company: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get detailed information from the server-rendered pages, or None if the site blocked us"""
+        if not company.get('name') or not company.get('city'):
+            return company
+        
+        search_url = self._details_search_url(company)
+        logger.info(f"Getting details for {company['name']}: {search_url}")
+        
+        # A missing or resultless search page means a captcha or JS challenge
+        search_page = _get_page(search_url)
+        if not search_page or 'search-results' not in search_page:
+            return None
+        
+        # Find the first result that matches our business and follow its link
+        for listing in BeautifulSoup(search_page, "html.parser").select("div.result"):
+            name_node = listing.select_one(LISTING_SELECTORS['name'])
+            if not name_node or not self.similar_names(name_node.get_text(" ", strip=True), company['name']):
+                continue
             
-            # Extract more details from about section
-            about_elements = self.driver.find_elements(By.CSS_SELECTOR, ".about dt")
-            for element in about_elements:
-                label = get_text_safely(element).lower()
-                try:
-                    value_element = element.find_element(By.XPATH, "following-sibling::dd[1]")
-                    
-                    if not value_element:
-                        continue
-                        
-                    value = get_text_safely(value_element)
-                    
-                    if "year established" in label and value:
-                        company['year_built'] = value
-                    elif "building size" in label and value:
-                        company['building_size'] = value
-                    elif "email" in label and value:
-                        company['email'] = value
-                except Exception:
-                    continue
+            link = name_node if name_node.name == 'a' else name_node.find_parent('a') or name_node.find('a')
+            if not link or not link.get('href'):
+                return company
             
-            # Recalculate lead score with new information
-            company['lead_score'] = self.calculate_lead_score(company)
+            detail_page = _get_page(urljoin(YELLOWPAGES_BASE_URL, link['href']))
+            if not detail_page or 'business-card' not in detail_page:
+                return None
             
+            self._apply_business_details(company, _parse_details_html(detail_page))
+            return company
+        
+        logger.warning(f"No results found for {company['name']}")
+        return company
+    
+    def _details_search_url(self, company: Dict[str, Any]) -> str:
+        """Search URL that should list a specific business first"""
+        business_name = company['name'].lower().replace(' ', '-')
+        city_state = f"{company['city'].lower().replace(' ', '-')}-{company['state'].lower()}"
+        return f"{YELLOWPAGES_BASE_URL}/search?search_terms={business_name}&geo_location_terms={city_state}"
+    
+    def _extract_business_details(self, company: Dict[str, Any], driver) -> None:
+        """Extract detailed business information from the detail page"""
+        try:
+            # Read every section inside the browser in a single round-trip
+            self._apply_business_details(company, driver.execute_script(EXTRACT_DETAILS_JS) or {})
         except Exception as e:
-            logger.error(f"Error extracting business details: {e}")
\ No newline at end of file
+            logger.error(f"Error extracting business details: {e}")
+    
+    def _apply_business_details(self, company: Dict[str, Any], details: Dict[str, Any]) -> None:
+        """Add the sections read from a detail page to a company"""
+        # Extract business description
+        if details.get('description') is not None:
+            company['description'] = details['description']
+        
+        # Extract services
+        services = details.get('services') or []
+        if services:
+            if 'category' in company:
+                company['category'] = f"{company['category']}, {', '.join(services)}"
+            else:
+                company['category'] = ', '.join(services)
+        
+        # Extract contact information
+        for title, name in details.get('contacts') or []:
+            if title.lower() in ["owner", "manager", "president", "ceo"]:
+                company['contact_title'] = title
+                if name is not None:
+                    company['contact_person'] = name
+        
+        # Extract more details from about section
+        for label, value in details.get('about') or []:
+            label = label.lower()
+            if "year established" in label and value:
+                company['year_built'] = value
+            elif "building size" in label and value:
+                company['building_size'] = value
+            elif "email" in label and value:
+                company['email'] = value
+        
+        # Recalculate lead score with new information
+        company['lead_score'] = self.calculate_lead_score(company)
+
+async def _fetch_pages(urls: List[str]) -> List[Optional[str]]:
+    """Fetch several pages concurrently over one HTTP/2 connection pool, None for any that failed"""
+    semaphore = asyncio.Semaphore(SOURCE_CONCURRENCY)
+    
+    async def fetch(client, url):
+        async with semaphore:
+            try:
+                response = await client.get(url)
+                response.raise_for_status()
+                return response.text
+            except httpx.HTTPError as e:
+                logger.error(f"Error fetching {url}: {e}")
+                return None
+    
+    headers = {'User-Agent': SELENIUM_USER_AGENT}
+    async with httpx.AsyncClient(http2=True, headers=headers, timeout=PAGE_TIMEOUT, follow_redirects=True) as client:
+        return await asyncio.gather(*(fetch(client, url) for url in urls))
+
+def _parse_details_html(html: str) -> Dict[str, Any]:
+    """Read a detail page's sections from its HTML, in the shape EXTRACT_DETAILS_JS returns"""
+    soup = BeautifulSoup(html, "html.parser")
+    text = lambda node: node.get_text(" ", strip=True) if node else None
+    return {
+        'description': text(soup.select_one(".business-description")),
+        'services': [text(item) for item in soup.select(".services ul li")],
+        'contacts': [(text(h), text(h.find_next_sibling("p"))) for h in soup.select(".contact h2")],
+        'about': [(text(dt), text(dt.find_next_sibling("dd")) or '') for dt in soup.select(".about dt")]
+    }
+
+def _get_http_client() -> httpx.Client:
+    """Return the keep-alive HTTP client shared by detail lookups across worker threads"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            transport = httpx.HTTPTransport(
+                http2=True, retries=2,
+                limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+            )
+            _http_client = httpx.Client(transport=transport, headers={'User-Agent': SELENIUM_USER_AGENT},
+                                        timeout=PAGE_TIMEOUT, follow_redirects=True)
+        return _http_client
+
+def _get_page(url: str) -> Optional[str]:
+    """Fetch a page over the shared HTTP client, None if it failed"""
+    try:
+        response = _get_http_client().get(url)
+        response.raise_for_status()
+        return response.text
+    except httpx.HTTPError as e:
+        logger.error(f"Error fetching {url}: {e}")
+        return None
+
+@atexit.register
+def _close_http_client():
+    """Close pooled connections held by the shared HTTP client"""
+    global _http_client
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # utils/console.py - Console display utilities for LeadFinder
 
+import threading
+
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, TextColumn, BarColumn, TaskProgressColumn
@@ -9,6 +11,33 @@ from typing import List, Dict, Any
 
 console = Console()
 
+# Special styling for certain table columns
+COLUMN_STYLES = {
+    "id": "dim",
+    "name": "bold",
+    "lead_score": "bold cyan",
+    "ai_analysis": ""
+}
+
+# Progress bar columns, shared by every progress display; they keep no per-task state
+PROGRESS_COLUMNS = (
+    TextColumn("[bold blue]{task.description}"),
+    BarColumn(),
+    TaskProgressColumn()
+)
+
+def _truncate_cell(value: Any) -> str:
+    """Shorten long cell text to fit a table column"""
+    text = str(value)
+    return f"{text[:27]}..." if len(text) > 30 else text
+
+# Special display formatting for certain table columns
+CELL_FORMATTERS = {
+    'lead_score': lambda value: f"{value}",
+    'ai_analysis': lambda value: "✓" if value else "",
+    'category': _truncate_cell
+}
+
 def display_welcome(version: str, ai_enabled: bool):
     """Display welcome message"""
     console.print(Panel.fit(
@@ -49,58 +78,74 @@ def display_table(title: str, data: List[Dict[str, Any]], columns: List[str] = N
     # Create table
     table = Table(title=title)
     
-    # Special formatting for certain columns
-    style_map = {
-        "id": "dim",
-        "name": "bold",
-        "lead_score": "bold cyan",
-        "ai_analysis": lambda val: "green" if val else ""
-    }
+    # Work out each column's header, style and formatter once per table
+    col_specs = [
+        (col, col.replace('_', ' ').title(), COLUMN_STYLES.get(col), CELL_FORMATTERS.get(col, str))
+        for col in columns
+    ]
     
     # Add columns
-    for col in columns:
-        # Get the style for this column
-        if col in style_map:
-            style = style_map[col]
-            if callable(style):
-                # For columns like ai_analysis where we need to check the value
-                style = ""
-        else:
-            style = None
-            
-        # Add column to table
-        table.add_column(col.replace('_', ' ').title(), style=style)
+    for _, header, style, _ in col_specs:
+        table.add_column(header, style=style)
     
     # Add rows
     for item in data:
-        row = []
-        for col in columns:
-            value = item.get(col, '')
-            
-            # Format specific columns
-            if col == 'lead_score':
-                row.append(f"{value}")
-            elif col == 'ai_analysis':
-                row.append("✓" if value else "")
-            elif col == 'category' and value and len(str(value)) > 30:
-                row.append(f"{str(value)[:27]}...")
-            else:
-                row.append(str(value))
-        
-        table.add_row(*row)
+        table.add_row(*[fmt(item.get(col, '')) for col, _, _, fmt in col_specs])
     
     console.print(table)
 
+class _SharedProgress(Progress):
+    """Progress display shared by concurrent searches; it stays live while any of them is running"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._users = 0
+        self._finished_tasks = []
+        self._users_lock = threading.Lock()
+    
+    def join(self):
+        """Start showing the display if nobody else is"""
+        with self._users_lock:
+            if self._users == 0:
+                self.start()
+            self._users += 1
+    
+    def leave(self, task_id):
+        """Stop the display once its last user is done, then clear the bars of users that finished"""
+        with self._users_lock:
+            self._users -= 1
+            self._finished_tasks.append(task_id)
+            if self._users == 0:
+                self.stop()
+                # Finished bars stay on screen; bars added by callers that haven't started are kept
+                for finished in self._finished_tasks:
+                    self.remove_task(finished)
+                self._finished_tasks.clear()
+
+# The console allows one live display at a time, so every progress bar goes on this one
+_progress = _SharedProgress(*PROGRESS_COLUMNS, console=console)
+
+class _ProgressBar:
+    """One caller's bar on the shared display; the display is live while the bar is entered"""
+    
+    def __init__(self, description: str, total: int):
+        self.task = _progress.add_task(description, total=total)
+    
+    def __enter__(self):
+        _progress.join()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _progress.leave(self.task)
+    
+    def update(self, task_id, **kwargs):
+        """Update a bar, as Progress.update does"""
+        _progress.update(task_id, **kwargs)
+
 def create_progress(description: str, total: int):
-    """Create and return a progress bar"""
-    progress = Progress(
-        TextColumn("[bold blue]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        console=console
-    )
-    task = progress.add_task(description, total=total)
-    return progress, task
+    """Add a progress bar to the shared display and return it with its task"""
+    bar = _ProgressBar(description, total)
+    return bar, bar.task
 
 def display_error(message: str):
     """Display error message"""
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+# utils/json_utils.py - JSON encoding and decoding for LeadFinder
+
+from typing import Any
+
+import orjson
+
+def json_loads(value: Any) -> Any:
+    """Parse a JSON document from a str or bytes"""
+    return orjson.loads(value)
+
+def json_dumps(value: Any) -> str:
+    """Serialize a value to a JSON string; dicts may have non-string keys, as with json.dumps"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
@@ -1,27 +1,165 @@
 #!/usr/bin/env python3
 # utils/selenium_utils.py - Selenium utilities for LeadFinder
 
+import os
 import sys
 import time
+import queue
+import atexit
+import threading
+from typing import Optional, Set
+from urllib.parse import urlsplit
+from contextlib import contextmanager
+from functools import lru_cache
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from rich.console import Console
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, ElementClickInterceptedException,
+    ElementNotInteractableException, InvalidSessionIdException
+)
 
-from config import SELENIUM_HEADLESS, SELENIUM_WINDOW_SIZE, SELENIUM_USER_AGENT, logger
+from config import (
+    SELENIUM_HEADLESS, SELENIUM_WINDOW_SIZE, SELENIUM_USER_AGENT, SELENIUM_BLOCK_RESOURCES,
+    SELENIUM_POOL_SIZE, SELENIUM_PAGE_LOAD_STRATEGY, SELENIUM_PERSIST_PROFILE, SELENIUM_PROFILE_DIR,
+    SELENIUM_DISK_CACHE_SIZE, logger
+)
+from utils.console import console
 
-console = Console()
+# Profile slots are locked at the OS level so concurrent LeadFinder runs skip each other's;
+# without fcntl (Windows) browsers use throwaway profiles instead
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Heavy or tracking requests the scrapers never need; stylesheets stay, since
+# clicks and scrolling depend on the page's layout
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm",
+    "*googletagmanager*", "*google-analytics*", "*doubleclick*", "*facebook.net*", "*hotjar*"
+]
+
+# Reads fields from every row matching a selector in one round-trip instead of one per
+# element; called with the row selector, {field: selector} for text and {field: selector} for links
+EXTRACT_ROWS_JS = """
+const [rowSelector, textSelectors, linkSelectors] = arguments;
+return Array.from(document.querySelectorAll(rowSelector)).map(row => {
+    const fields = {};
+    for (const [field, selector] of Object.entries(textSelectors)) {
+        const e = row.querySelector(selector);
+        if (e) fields[field] = (e.innerText || '').trim();
+    }
+    for (const [field, selector] of Object.entries(linkSelectors)) {
+        const e = row.querySelector(selector);
+        if (e) fields[field] = e.getAttribute('href') || '';
+    }
+    return fields;
+});
+"""
+
+# Scrolls a container (or the page) inside the browser until its content stops growing
+# or holds enough items, resolving with the number of items loaded
+AUTO_SCROLL_JS = """
+const done = arguments[arguments.length - 1];
+const [containerSelector, itemSelector, target, settleMs, maxSteps] = arguments;
+const box = containerSelector ? document.querySelector(containerSelector) : document.scrollingElement;
+const count = () => itemSelector ? document.querySelectorAll(itemSelector).length : 0;
+if (!box) { done(count()); return; }
+let height = 0, stable = 0, steps = 0;
+const timer = setInterval(() => {
+    box.scrollTo(0, box.scrollHeight);
+    if ((target && count() >= target) || ++steps >= maxSteps) { clearInterval(timer); done(count()); return; }
+    if (box.scrollHeight === height) {
+        if (++stable > 2) { clearInterval(timer); done(count()); }
+    } else {
+        height = box.scrollHeight;
+        stable = 0;
+    }
+}, settleMs);
+"""
+
+# Chrome features with background work the scrapers never use
+DISABLED_CHROME_FEATURES = (
+    "Translate", "MediaRouter", "OptimizationHints", "InterestCohort", "CalculateNativeWinOcclusion"
+)
+
+# Seconds between checks in the explicit waits; Selenium's default of 0.5 adds up to
+# half a second to every lookup
+WAIT_POLL_FREQUENCY = 0.1
+
+@lru_cache(maxsize=1)
+def _chromedriver_path() -> str:
+    """Resolve the ChromeDriver binary once per process; later drivers skip the version lookup"""
+    # Only needed when Selenium Manager can't find a driver, so webdriver_manager is optional
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+# Most persistent profiles tried before a browser falls back to a throwaway one
+MAX_PROFILE_SLOTS = 16
+
+# Chrome refuses a profile directory another browser has open, so each browser holds a
+# numbered profile slot; slot -> its locked lock file, and driver id -> slot
+_profile_locks = {}
+_driver_profile_slots = {}
+_profile_slots_lock = threading.Lock()
+
+def _claim_profile_slot() -> Optional[int]:
+    """Lock the lowest profile slot no browser in any process is using, or None if none is free"""
+    if fcntl is None:
+        return None
+    os.makedirs(SELENIUM_PROFILE_DIR, exist_ok=True)
+    with _profile_slots_lock:
+        for slot in range(MAX_PROFILE_SLOTS):
+            if slot in _profile_locks:
+                continue
+            lock_file = open(os.path.join(SELENIUM_PROFILE_DIR, f"{slot}.lock"), "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Held by a browser in another process
+                lock_file.close()
+                continue
+            _profile_locks[slot] = lock_file
+            return slot
+    return None
+
+def _release_profile_slot(slot: Optional[int]):
+    """Unlock a profile slot so another browser can use it"""
+    with _profile_slots_lock:
+        lock_file = _profile_locks.pop(slot, None)
+    if lock_file:
+        lock_file.close()
+
+def _quit_driver(driver):
+    """Quit a driver and free its profile slot"""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    with _profile_slots_lock:
+        slot = _driver_profile_slots.pop(id(driver), None)
+    _release_profile_slot(slot)
 
 def setup_selenium():
     """Set up and return a Selenium WebDriver"""
+    profile_slot = None
+    driver = None
     try:
         options = Options()
         
+        # Reuse a profile from an earlier run, keeping its HTTP cache, HSTS list and DNS entries;
+        # with every slot taken, Chrome gets a throwaway profile as before
+        if SELENIUM_PERSIST_PROFILE:
+            profile_slot = _claim_profile_slot()
+            if profile_slot is not None:
+                options.add_argument(f"--user-data-dir={os.path.join(SELENIUM_PROFILE_DIR, str(profile_slot))}")
+                options.add_argument(f"--disk-cache-size={SELENIUM_DISK_CACHE_SIZE}")
+        
         # Configure headless mode
         if SELENIUM_HEADLESS:
             options.add_argument("--headless")
@@ -34,38 +172,169 @@ def setup_selenium():
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-gpu")
         
-        # Add user agent to avoid detection
-        options.add_argument(f"user-agent={SELENIUM_USER_AGENT}")
+        # Turn off background services that compete with page loads for CPU and network
+        options.add_argument(f"--disable-features={','.join(DISABLED_CHROME_FEATURES)}")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-sync")
+        options.add_argument("--mute-audio")
+        
+        # Don't download or decode images, and never stop for notification prompts
+        if SELENIUM_BLOCK_RESOURCES:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2
+            })
+        
+        # Don't wait for the load event after navigation
+        options.page_load_strategy = SELENIUM_PAGE_LOAD_STRATEGY
         
-        # Install the latest ChromeDriver
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        # Selenium Manager resolves and caches a matching ChromeDriver itself;
+        # webdriver_manager is only a fallback for setups where it can't
+        try:
+            driver = webdriver.Chrome(options=options)
+        except Exception as e:
+            logger.warning(f"Selenium Manager couldn't start Chrome, trying webdriver_manager: {e}")
+            driver = webdriver.Chrome(service=Service(_chromedriver_path()), options=options)
+        
+        if profile_slot is not None:
+            with _profile_slots_lock:
+                _driver_profile_slots[id(driver)] = profile_slot
         
         # Set page load timeout
         driver.set_page_load_timeout(30)
         
+        # Scrapers only read pages, so never write a download to disk
+        driver.execute_cdp_cmd("Browser.setDownloadBehavior", {"behavior": "deny"})
+        
+        # Add user agent to avoid detection; set over CDP so it can change without a relaunch
+        set_user_agent(driver, SELENIUM_USER_AGENT)
+        
+        # Abort fonts, media, trackers and any remaining images at the network layer
+        if SELENIUM_BLOCK_RESOURCES:
+            block_urls(driver, BLOCKED_URL_PATTERNS)
+        
         return driver
     except Exception as e:
+        # Don't leave a half-configured browser running or its profile slot locked
+        if driver is not None:
+            _quit_driver(driver)
+        _release_profile_slot(profile_slot)
         logger.error(f"Error setting up Selenium: {e}")
         console.print(f"[bold red]Error setting up Selenium: {e}[/bold red]")
         console.print("[yellow]Make sure you have Chrome installed on your system.[/yellow]")
         sys.exit(1)
 
+def block_urls(driver, patterns):
+    """Make the browser fail requests matching any of the URL patterns before they're sent"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+def set_user_agent(driver, user_agent: str):
+    """Change the user agent a running browser sends from its next request on"""
+    driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": user_agent})
+
+def _visited_origins(driver) -> Set[str]:
+    """Origins of the web pages a driver has loaded since its navigation history was last reset"""
+    history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+    origins = set()
+    for entry in history.get('entries', []):
+        parts = urlsplit(entry.get('url', ''))
+        if parts.scheme in ('http', 'https') and parts.netloc:
+            origins.add(f"{parts.scheme}://{parts.netloc}")
+    return origins
+
+# Idle drivers kept warm so later scrapes skip Chrome's cold start
+_DRIVER_POOL = queue.Queue()
+
+def acquire_driver():
+    """Get an idle driver from the pool, starting a new one if none are available"""
+    try:
+        return _DRIVER_POOL.get_nowait()
+    except queue.Empty:
+        return setup_selenium()
+
+@contextmanager
+def get_driver():
+    """Borrow a pooled driver for the duration of a with block"""
+    driver = acquire_driver()
+    try:
+        # Rely purely on explicit waits so they don't interact with an implicit timeout
+        driver.implicitly_wait(0)
+        yield driver
+    finally:
+        release_driver(driver)
+
+def release_driver(driver):
+    """Reset a driver's session state and return it to the pool"""
+    # Keep at most SELENIUM_POOL_SIZE idle browsers around
+    if _DRIVER_POOL.qsize() >= SELENIUM_POOL_SIZE:
+        _quit_driver(driver)
+        return
+    
+    try:
+        origins = _visited_origins(driver)
+        driver.get("about:blank")
+        # Clear every site's cookies, then the storage of each site this borrower visited
+        # (CDP has no wildcard origin), so nothing leaks into the next borrower's session
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in origins:
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        # Start the next borrower with an empty history, so only its own sites get cleared
+        driver.execute_cdp_cmd("Page.resetNavigationHistory", {})
+    except Exception as e:
+        # Don't pool a driver that can no longer be driven
+        logger.warning(f"Discarding unusable driver: {e}")
+        _quit_driver(driver)
+        return
+    _DRIVER_POOL.put(driver)
+
+@atexit.register
+def close_driver_pool():
+    """Quit every idle driver in the pool"""
+    while True:
+        try:
+            driver = _DRIVER_POOL.get_nowait()
+        except queue.Empty:
+            break
+        _quit_driver(driver)
+
+def find_or_none(driver, by, value, timeout=0):
+    """Find an element, waiting up to timeout seconds inside the browser, or return None"""
+    try:
+        # An implicit wait polls in the browser, one command instead of one per poll;
+        # drivers otherwise run with no implicit wait so explicit waits behave as written
+        if timeout:
+            driver.implicitly_wait(timeout)
+        return driver.find_element(by, value)
+    except NoSuchElementException:
+        return None
+    finally:
+        if timeout:
+            driver.implicitly_wait(0)
+
 def wait_for_element(driver, by, value, timeout=10):
     """Wait for an element to be present on the page"""
-    try:
-        element = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((by, value))
-        )
-        return element
-    except TimeoutException:
+    element = find_or_none(driver, by, value, timeout)
+    if element is None:
         logger.warning(f"Timeout waiting for element: {value}")
-        return None
+    return element
+
+def navigate(driver, url, by, value, timeout=20):
+    """Open a page and wait only until the element the caller needs is there, or return None
+    
+    Under the "eager" or "none" page load strategies driver.get returns before the load
+    event, so slow third-party scripts don't hold up scraping.
+    """
+    driver.get(url)
+    return wait_for_element(driver, by, value, timeout)
 
-def wait_for_elements(driver, by, value, timeout=10):
+def wait_for_elements(driver, by, value, timeout=10, poll_frequency=WAIT_POLL_FREQUENCY):
     """Wait for elements to be present on the page"""
     try:
-        elements = WebDriverWait(driver, timeout).until(
+        elements = WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
             EC.presence_of_all_elements_located((by, value))
         )
         return elements
@@ -73,10 +342,10 @@ def wait_for_elements(driver, by, value, timeout=10):
         logger.warning(f"Timeout waiting for elements: {value}")
         return []
 
-def wait_for_clickable(driver, by, value, timeout=10):
+def wait_for_clickable(driver, by, value, timeout=10, poll_frequency=WAIT_POLL_FREQUENCY):
     """Wait for an element to be clickable"""
     try:
-        element = WebDriverWait(driver, timeout).until(
+        element = WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
             EC.element_to_be_clickable((by, value))
         )
         return element
@@ -85,24 +354,53 @@ def wait_for_clickable(driver, by, value, timeout=10):
         return None
 
 def safe_click(driver, element):
-    """Safely click an element with retry"""
+    """Safely click an element with retry, falling back to a script click"""
     max_attempts = 3
     for attempt in range(max_attempts):
         try:
-            element.click()
+            # Retries click from script, which overlays and off-screen positions can't intercept
+            if attempt == 0:
+                element.click()
+            else:
+                driver.execute_script("arguments[0].click();", element)
             return True
-        except Exception as e:
+        except (ElementClickInterceptedException, ElementNotInteractableException) as e:
+            # Only a covered or not-yet-interactive element is worth another try
             if attempt == max_attempts - 1:
                 logger.warning(f"Failed to click element after {max_attempts} attempts: {e}")
                 return False
-            time.sleep(1)
+            # Back off briefly: 0.1s, then 0.2s
+            time.sleep(0.1 * 2 ** attempt)
+        except InvalidSessionIdException:
+            # The browser is gone; let the caller abandon its work
+            raise
+        except Exception as e:
+            # Stale elements and other failures won't change by waiting
+            logger.warning(f"Failed to click element: {e}")
+            return False
+
+def _wait_scroll_settled(driver, timeout=0.5):
+    """Wait until the page has loaded and its scroll position stops changing, at most timeout seconds"""
+    last = [None]
+    
+    def settled(d):
+        # Compare each sample with the one before, so smooth scrolling has to finish first
+        state = d.execute_script("return document.readyState === 'complete' ? window.pageYOffset : null;")
+        done = state is not None and state == last[0]
+        last[0] = state
+        return done
+    
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.05).until(settled)
+    except TimeoutException:
+        pass
 
 def scroll_to_element(driver, element):
     """Scroll to make an element visible"""
     try:
         driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        # Add a small delay to let the page settle
-        time.sleep(0.5)
+        # Let the page settle
+        _wait_scroll_settled(driver)
         return True
     except Exception as e:
         logger.warning(f"Failed to scroll to element: {e}")
@@ -112,19 +410,33 @@ def scroll_down(driver, pixels=300):
     """Scroll down the page by a number of pixels"""
     try:
         driver.execute_script(f"window.scrollBy(0, {pixels});")
-        # Add a small delay to let the page settle
-        time.sleep(0.5)
+        # Let the page settle
+        _wait_scroll_settled(driver)
         return True
     except Exception as e:
         logger.warning(f"Failed to scroll down: {e}")
         return False
 
+def auto_scroll(driver, container_selector=None, item_selector=None, target=0, settle_ms=500, max_steps=40):
+    """Keep scrolling inside the browser until new content stops appearing, in one round-trip
+    
+    Scrolls the element matching container_selector, or the page, and stops early once
+    target elements match item_selector. Returns how many match when it stops, or 0 on failure.
+    The driver's script timeout must allow for up to max_steps * settle_ms.
+    """
+    try:
+        return driver.execute_async_script(AUTO_SCROLL_JS, container_selector, item_selector,
+                                           target, settle_ms, max_steps) or 0
+    except Exception as e:
+        logger.warning(f"Failed to scroll: {e}")
+        return 0
+
 def scroll_to_bottom(driver):
     """Scroll to the bottom of the page"""
     try:
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        # Add a small delay to let the page settle
-        time.sleep(0.5)
+        # Let the page settle
+        _wait_scroll_settled(driver)
         return True
     except Exception as e:
         logger.warning(f"Failed to scroll to bottom: {e}")
@@ -140,11 +452,48 @@ def get_text_safely(element, default=""):
         return default
 
 def get_attribute_safely(element, attribute, default=""):
-    """Safely get an attribute from an element with a default value"""
+    """Safely get an attribute from an element with a default value
+    
+    Reads the attribute as written in the page, so links may come back relative.
+    """
     try:
         if element:
-            value = element.get_attribute(attribute)
+            # get_dom_attribute skips the property lookup script get_attribute runs
+            read = getattr(element, "get_dom_attribute", element.get_attribute)
+            value = read(attribute)
             return value.strip() if value else default
         return default
     except Exception:
-        return default
\ No newline at end of file
+        return default
+
+def get_texts_batch(driver, elements, default=""):
+    """Get the text of many elements in one round-trip instead of one per element"""
+    if not elements:
+        return []
+    try:
+        texts = driver.execute_script("return arguments[0].map(e => (e.innerText || '').trim());", elements)
+        return [text or default for text in texts]
+    except Exception as e:
+        logger.warning(f"Failed to read element texts: {e}")
+        return [get_text_safely(element, default) for element in elements]
+
+def extract_rows(driver, row_selector, field_selectors, link_selectors=None):
+    """Read the text fields and links of every row matching a selector with one script call"""
+    try:
+        return driver.execute_script(EXTRACT_ROWS_JS, row_selector, field_selectors, link_selectors or {}) or []
+    except Exception as e:
+        logger.warning(f"Failed to extract rows for {row_selector}: {e}")
+        return []
+
+def get_attributes_batch(driver, elements, attribute, default=""):
+    """Get an attribute of many elements in one round-trip instead of one per element"""
+    if not elements:
+        return []
+    try:
+        values = driver.execute_script(
+            "return arguments[0].map(e => (e.getAttribute(arguments[1]) || '').trim());", elements, attribute
+        )
+        return [value or default for value in values]
+    except Exception as e:
+        logger.warning(f"Failed to read element attributes: {e}")
+        return [get_attribute_safely(element, attribute, default) for element in elements]
\ No newline at end of file